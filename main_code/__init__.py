@@ -1,2 +1,58 @@
-from .multiprocessing_calculation import AbstractDynamicModel, CalculatorOptions, run_simulation, keyboard
-from .dynamic_classes import *
+"""
+    The public names are imported from their modules only when first used (PEP 562), so that
+    "import main_code" is cheap and every process (headless runs, spawned workers and plots)
+    loads only what it needs. matplotlib and pynput are never imported by the calculation.
+"""
+
+import importlib
+
+
+PUBLIC_NAMES = {
+
+    "CalculatorOptions": ".multiprocessing_calculation",
+    "run_simulation": ".multiprocessing_calculation",
+    "keyboard": ".dynamic_classes.dynamic_abstract_class",
+    "run_headless": ".headless_calculation",
+    "init_headless_params": ".headless_calculation",
+    "HeadlessParam": ".headless_calculation",
+    "replay_headless": ".headless_calculation",
+    "StepSchedule": ".input_schedule",
+    "RampSchedule": ".input_schedule",
+    "PiecewiseLinearSchedule": ".input_schedule",
+    "load_schedule_csv": ".input_schedule",
+    "InputRecording": ".input_schedule",
+    "run_sweep": ".parameter_sweep",
+    "build_sweep_grid": ".parameter_sweep",
+    "SweepResults": ".parameter_sweep",
+    "build_operating_map": ".operating_map",
+    "OperatingMap": ".operating_map",
+    "SimulationSession": ".session",
+    "SimulationService": ".simulation_service",
+    "ExplicitEuler": ".integrators",
+    "RK4": ".integrators",
+    "RK45": ".integrators",
+    "BDF": ".integrators",
+    "AbstractDynamicModel": ".dynamic_classes",
+    "WaterTankDynamicModel": ".dynamic_classes",
+    "BoilerDynamicModel": ".dynamic_classes",
+    "AbstractEnsembleModel": ".dynamic_classes",
+    "WaterTankEnsembleModel": ".dynamic_classes",
+    "BoilerEnsembleModel": ".dynamic_classes",
+
+}
+
+__all__ = list(PUBLIC_NAMES.keys())
+
+
+def __getattr__(name):
+
+    if name not in PUBLIC_NAMES:
+        raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
+
+    value = getattr(importlib.import_module(PUBLIC_NAMES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + __all__)
@@ -0,0 +1,287 @@
+from main_code.headless_calculation import run_headless
+from main_code.ring_buffer import SharedRingBuffer
+import numpy as np
+import subprocess
+import platform
+import json
+import time
+import sys
+import os
+
+
+def get_time(function, n_repeat=5, setup=None) -> float:
+
+    """
+        Best of "n_repeat" executions of "function()" [s] (the least disturbed one). "setup()",
+        if given, is called before each execution and is not timed.
+    """
+
+    times = list()
+    for i in range(n_repeat):
+
+        if setup is not None:
+            setup()
+
+        start_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start_time)
+
+    return min(times)
+
+
+def get_environment() -> dict:
+
+    try:
+        commit = subprocess.run(
+
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+
+        ).stdout.strip()
+
+    except OSError:
+        commit = ""
+
+    return {
+
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor()
+
+    }
+
+
+# <----------------------------------------------------------------------------->
+# BENCHMARKS
+# <----------------------------------------------------------------------------->
+
+def benchmark_model(model_class, dt=0.05, n_steps=2000, n_repeat=3) -> dict:
+
+    """Headless steps per second of a model (first, cold, initialization measured separately)."""
+
+    model = model_class()
+
+    start_time = time.perf_counter()
+    model.initialize()
+    init_time = time.perf_counter() - start_time
+
+    def run():
+        run_headless(model, dt, dt * n_steps, initialize=False)
+
+    # The model is initialized again before each repetition, outside of the timed steps
+    step_time = get_time(run, n_repeat, setup=model.initialize) / n_steps
+    return {"init_time": init_time, "step_time": step_time, "steps_per_second": 1 / step_time}
+
+
+def benchmark_thermo_calls(point_class, fluid, states: dict, n_calls=200, n_repeat=3) -> dict:
+
+    """
+        Cost of a flash (two "set_variable" and one "get_variable") for each input pair.
+        "states" is {label: (name_1, value_1, name_2, value_2, output)}.
+    """
+
+    point = point_class([fluid], [1.])
+
+    results = dict()
+    for label, (name_1, value_1, name_2, value_2, output) in states.items():
+
+        def run():
+
+            for i in range(n_calls):
+                point.set_variable(name_1, value_1)
+                point.set_variable(name_2, value_2)
+                point.get_variable(output)
+
+        results.update({label: get_time(run, n_repeat) / n_calls})
+
+    return results
+
+
+STARTUP_SCRIPT = """
+import time
+start_time = time.perf_counter()
+import {module}
+import_time = time.perf_counter() - start_time
+import json, sys
+print(json.dumps({{"import_time": import_time, "modules": [name for name in {modules} if name in sys.modules]}}))
+"""
+
+
+def benchmark_startup(module="main_code.multiprocessing_calculation", n_repeat=3) -> dict:
+
+    """
+        Import time of "module" in a fresh interpreter (what every spawned process pays before
+        starting) and the heavy packages loaded by the import.
+    """
+
+    heavy_modules = ["matplotlib", "pynput", "scipy", "REFPROPConnector"]
+    script = STARTUP_SCRIPT.format(module=module, modules=heavy_modules)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    results = list()
+    for i in range(n_repeat):
+
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, cwd=root, check=True)
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    loaded = results[0]["modules"]
+    return {
+
+        "import_time": min(result["import_time"] for result in results),
+        "loaded_modules": {name: name in loaded for name in heavy_modules}
+
+    }
+
+
+def benchmark_ring_buffer(n_columns=4, buffer_size=1000, n_rows=20000, batch_size=10, n_reads=200) -> dict:
+
+    ring = SharedRingBuffer.create((buffer_size, n_columns))
+    row = np.arange(n_columns, dtype=float)
+    rows = np.tile(row, (batch_size, 1))
+
+    try:
+
+        def write():
+            for i in range(n_rows):
+                ring.write(row)
+
+        def write_rows():
+            for i in range(n_rows // batch_size):
+                ring.write_rows(rows)
+
+        def read():
+            for i in range(n_reads):
+                ring.read()
+
+        return {
+
+            "write_rows_per_second": n_rows / get_time(write),
+            "batch_write_rows_per_second": n_rows / get_time(write_rows),
+            "read_time": get_time(read) / n_reads
+
+        }
+
+    finally:
+        ring.close()
+        ring.unlink()
+
+
+def benchmark_plot_frame(n_axes=3, n_points=1000, n_frames=100) -> dict:
+
+    """Frame time of LivePlot on an off-screen Agg canvas (no display needed)."""
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from main_code.live_plot import LivePlot
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    axs = fig.subplots(nrows=n_axes)
+    live_plot = LivePlot(fig, axs)
+    fig.canvas.draw()
+
+    x = np.linspace(0., 10., n_points)
+
+    def run():
+        for i in range(n_frames):
+            live_plot.update(x + i * 0.01, [np.sin(x + i * 0.01 + n) for n in range(n_axes)])
+
+    start_time = time.perf_counter()
+    fig.canvas.draw()
+    full_draw_time = time.perf_counter() - start_time
+
+    return {"frame_time": get_time(run, 3) / n_frames, "full_draw_time": full_draw_time}
+
+
+# <----------------------------------------------------------------------------->
+# SUITE
+# <----------------------------------------------------------------------------->
+
+THERMO_STATES = {
+
+    "water": {
+
+        "T-Q": ("T", 100., "Q", 0., "rho"),
+        "P-Q": ("P", 1., "Q", 1., "h"),
+        "H-rho": ("H", 1500., "rho", 100., "P")
+
+    },
+    "n-pentane": {
+
+        "T-Q": ("T", 50., "Q", 0., "rho"),
+        "P-Q": ("P", 0.5, "Q", 1., "h"),
+        "H-rho": ("H", 200., "rho", 100., "P")
+
+    }
+
+}
+
+
+def run_benchmarks(model_classes: dict, point_class=None, output_file=None, quick=False) -> dict:
+
+    """
+        Runs the whole suite and returns (and optionally saves as JSON) the results:
+
+            model_classes   {label: AbstractDynamicModel subclass} benchmarked headless
+            point_class     ThermodynamicPoint class used for the flash benchmarks
+
+        "quick" reduces the number of steps (for a fast check, not for comparisons).
+    """
+
+    scale = 0.1 if quick else 1.
+    results = {"environment": get_environment(), "models": dict(), "thermo": dict()}
+
+    for label, model_class in model_classes.items():
+        results["models"].update({label: benchmark_model(model_class, n_steps=int(2000 * scale))})
+        print("{}: {:.0f} steps/s".format(label, results["models"][label]["steps_per_second"]))
+
+    if point_class is not None:
+
+        results["environment"].update({"thermo_backend": "{}.{}".format(point_class.__module__, point_class.__name__)})
+
+        for fluid, states in THERMO_STATES.items():
+            results["thermo"].update({fluid: benchmark_thermo_calls(point_class, fluid, states, n_calls=int(200 * scale))})
+
+    results.update({
+
+        "startup": benchmark_startup(n_repeat=1 if quick else 3),
+        "ring_buffer": benchmark_ring_buffer(n_rows=int(20000 * scale)),
+        "plot": benchmark_plot_frame(n_frames=int(100 * scale))
+
+    })
+
+    if output_file is not None:
+        with open(output_file, "w") as file:
+            json.dump(results, file, indent=4)
+
+    return results
+
+
+def compare_benchmarks(reference: dict, results: dict, tolerance=0.2) -> list:
+
+    """
+        Timings (keys ending with "time") more than "tolerance" slower than in "reference"
+        (e.g. the JSON of a previous commit). Returns a list of (key, reference, new value).
+    """
+
+    regressions = list()
+
+    def compare(reference_values, new_values, path):
+
+        for key, reference_value in reference_values.items():
+
+            if key not in new_values or key == "environment":
+                continue
+
+            if isinstance(reference_value, dict):
+                compare(reference_value, new_values[key], path + [key])
+
+            elif key.endswith("time") or path[:1] == ["thermo"]:
+                if new_values[key] > reference_value * (1 + tolerance):
+                    regressions.append(("/".join(path + [key]), reference_value, new_values[key]))
+
+    compare(reference, results, list())
+    return regressions
@@ -0,0 +1,262 @@
+from main_code.headless_calculation import HeadlessParam
+import multiprocessing.shared_memory as shm
+import numpy as np
+
+
+class ControlBlock:
+
+    """
+        Stop flag, time scale, pause and model shared params stored as a single NumPy record
+        in a SharedMemory segment. Every write increments the "generation" counter twice (odd
+        while writing) so that readers can take a consistent copy without locks, and can skip
+        the copy altogether when the generation did not change.
+
+        There must be only one writer (the keyboard listener), readers are free.
+    """
+
+    GENERATION = "generation"
+    STOP = "stop"
+    COMMON_PARAMS = {"dt_%": 1., "pause": 0.}
+
+    def __init__(self, shared_mem: shm.SharedMemory, fields: list, owner=False):
+
+        self.shared_mem = shared_mem
+        self.fields = list(fields)
+        self.owner = owner
+
+        self.dtype = self.get_dtype(self.fields)
+        self.record = np.ndarray((), dtype=self.dtype, buffer=shared_mem.buf)
+
+    def __reduce__(self):
+
+        # Processes started with "spawn" attach to the same segment instead of copying the record
+        return type(self).attach, (self.name, self.fields)
+
+    @classmethod
+    def get_dtype(cls, fields: list) -> np.dtype:
+
+        return np.dtype(
+
+            [(cls.GENERATION, np.int64), (cls.STOP, np.int64)] +
+            [(field, np.float64) for field in fields]
+
+        )
+
+    @classmethod
+    def get_fields(cls, shared_params: dict, prefix="") -> dict:
+
+        """Fields (and initial values) for the params returned by "get_shared_params"."""
+
+        return {prefix + key: float(value) for key, value in shared_params.items()}
+
+    @classmethod
+    def create(cls, initial_values: dict, name=None):
+
+        """"initial_values" are the model params ("dt_%" and "pause" are always added)."""
+
+        values = dict(cls.COMMON_PARAMS)
+        values.update(initial_values)
+
+        fields = list(values.keys())
+        shared_mem = shm.SharedMemory(name=name, create=True, size=cls.get_dtype(fields).itemsize)
+        block = cls(shared_mem, fields, owner=True)
+
+        block.record[cls.GENERATION] = 0
+        block.record[cls.STOP] = 0
+        for field, value in values.items():
+            block.record[field] = value
+
+        return block
+
+    @classmethod
+    def attach(cls, name, fields: list):
+        return cls(shm.SharedMemory(name=name), fields)
+
+    @property
+    def name(self) -> str:
+        return self.shared_mem.name
+
+    @property
+    def generation(self) -> int:
+        return int(self.record[self.GENERATION])
+
+    def write(self, field, value):
+
+        self.record[self.GENERATION] += 1
+        self.record[field] = value
+        self.record[self.GENERATION] += 1
+
+    def write_values(self, values: dict):
+
+        """Several fields written as a single change (readers see all or none of them)."""
+
+        self.record[self.GENERATION] += 1
+        for field, value in values.items():
+            self.record[field] = value
+        self.record[self.GENERATION] += 1
+
+    def read(self, max_retries=100):
+
+        """Consistent copy of the record, returns (values, generation)."""
+
+        for i in range(max_retries):
+
+            generation = self.record[self.GENERATION]
+            if generation % 2 == 1:
+                continue
+
+            values = self.record.copy()
+            if self.record[self.GENERATION] == generation:
+                return values, int(generation)
+
+        values = self.record.copy()
+        return values, int(values[self.GENERATION])
+
+    @property
+    def stop_flag(self):
+        return StopFlag(self)
+
+    def get_params(self, prefix="") -> dict:
+
+        """
+            ControlParam for "dt_%", "pause" and the fields starting with "prefix" (which is
+            removed from the keys), to be used as the "shared_params" of a model.
+        """
+
+        params = {key: ControlParam(self, key) for key in self.COMMON_PARAMS.keys()}
+        for field in self.fields:
+            if field not in self.COMMON_PARAMS and field.startswith(prefix):
+                params[field[len(prefix):]] = ControlParam(self, field)
+
+        return params
+
+    def close(self):
+
+        self.record = None
+        self.shared_mem.close()
+
+    def unlink(self):
+        self.shared_mem.unlink()
+
+
+class StatsBlock(ControlBlock):
+
+    """
+        Profiling statistics published by the worker (the only writer) for the dashboard:
+        a "phase/statistic" field for each phase and a "deadline/..." field for each value
+        of the SchedulerStats.
+    """
+
+    COMMON_PARAMS = dict()
+    STATISTICS = ["mean", "p50", "p95", "p99", "max", "n_calls"]
+    DEADLINE_STATISTICS = ["n_steps", "n_late", "n_missed", "max_lateness", "mean_jitter", "occupation"]
+
+    @classmethod
+    def get_stats_fields(cls, phases: list) -> dict:
+
+        fields = dict()
+        for phase in phases:
+            fields.update({"{}/{}".format(phase, key): 0. for key in cls.STATISTICS})
+
+        fields.update({"deadline/{}".format(key): 0. for key in cls.DEADLINE_STATISTICS})
+        return fields
+
+    @property
+    def phases(self) -> list:
+
+        phases = list()
+        for field in self.fields:
+
+            phase = field.split("/")[0]
+            if not phase == "deadline" and phase not in phases:
+                phases.append(phase)
+
+        return phases
+
+    def publish(self, summary: dict, scheduler_stats: dict):
+
+        """"summary" as returned by StepProfiler.summary, phases not in the block are ignored."""
+
+        values = dict()
+        for phase, statistics in summary.items():
+            for key, value in statistics.items():
+
+                field = "{}/{}".format(phase, key)
+                if field in self.dtype.names:
+                    values[field] = value
+
+        for key in self.DEADLINE_STATISTICS:
+            values["deadline/{}".format(key)] = scheduler_stats[key]
+
+        self.write_values(values)
+
+    def get_statistics(self):
+
+        """Returns ({phase: {statistic: value}}, {deadline statistic: value})."""
+
+        values, generation = self.read()
+        statistics = {
+
+            phase: {key: values["{}/{}".format(phase, key)].item() for key in self.STATISTICS}
+            for phase in self.phases
+
+        }
+        deadline = {key: values["deadline/{}".format(key)].item() for key in self.DEADLINE_STATISTICS}
+        return statistics, deadline
+
+
+class ControlParam:
+
+    """Live view of a field of a ControlBlock (same ".value" interface of multiprocessing.Value)."""
+
+    def __init__(self, block: ControlBlock, field):
+
+        self.block = block
+        self.field = field
+
+    @property
+    def value(self):
+        return self.block.record[self.field].item()
+
+    @value.setter
+    def value(self, value):
+        self.block.write(self.field, value)
+
+
+class StopFlag:
+
+    """Same "is_set" / "set" interface of a multiprocessing Event."""
+
+    def __init__(self, block: ControlBlock):
+        self.block = block
+
+    def is_set(self) -> bool:
+        return bool(self.block.record[ControlBlock.STOP])
+
+    def set(self):
+        self.block.write(ControlBlock.STOP, 1)
+
+
+class ControlSnapshot:
+
+    """
+        Local copies (HeadlessParam) of a group of ControlParam, refreshed by "update" only when
+        the generation counter of the block has changed: the worker reads one integer per step.
+    """
+
+    def __init__(self, shared_params: dict):
+
+        self.block = next(iter(shared_params.values())).block
+        self.fields = {key: param.field for key, param in shared_params.items()}
+        self.params = {key: HeadlessParam(0.) for key in shared_params.keys()}
+        self.generation = None
+
+    def update(self) -> dict:
+
+        if not self.block.generation == self.generation:
+
+            values, self.generation = self.block.read()
+            for key, field in self.fields.items():
+                self.params[key].value = values[field].item()
+
+        return self.params
@@ -0,0 +1,92 @@
+import numpy as np
+
+
+class Decimator:
+
+    """
+        Reduces the rows produced at each calculation step to one block every "factor" steps:
+
+            "last"      the last row of the block
+            "mean"      the mean of the rows of the block
+            "minmax"    two rows (envelope) at the times of the first and of the last row of
+                        the block: for each column the extreme reached first (minimum or
+                        maximum) is in the first row, so a falling signal gives falling rows
+
+        The first column is considered to be the time.
+    """
+
+    MODES = ["last", "mean", "minmax"]
+
+    def __init__(self, factor=1, mode="last"):
+
+        if mode not in self.MODES:
+            raise ValueError("Unknown decimation mode '{}' (use one of {})".format(mode, self.MODES))
+
+        self.factor = max(1, int(factor))
+        self.mode = mode
+
+        self.n_pushed = 0
+        self.__sum = None
+        self.__min = None
+        self.__max = None
+        self.__i_min = None
+        self.__i_max = None
+        self.__t_first = 0.
+
+    @property
+    def rows_per_block(self) -> int:
+        return 2 if self.mode == "minmax" else 1
+
+    def push(self, row):
+
+        """Returns the rows to be written (a 2D array) at the end of each block, None otherwise."""
+
+        if self.factor == 1:
+            return np.asarray(row)[np.newaxis, :]
+
+        row = np.asarray(row, dtype=float)
+        first = self.n_pushed == 0
+
+        if self.mode == "mean":
+            self.__sum = row.copy() if first else self.__sum + row
+
+        elif self.mode == "minmax":
+
+            if first:
+                self.__min, self.__max = row.copy(), row.copy()
+                self.__i_min, self.__i_max = np.zeros(len(row), dtype=int), np.zeros(len(row), dtype=int)
+                self.__t_first = row[0]
+
+            else:
+
+                # Index in the block of each extreme, to keep the order in which they happened
+                new_min = row < self.__min
+                new_max = row > self.__max
+
+                self.__min[new_min] = row[new_min]
+                self.__max[new_max] = row[new_max]
+                self.__i_min[new_min] = self.n_pushed
+                self.__i_max[new_max] = self.n_pushed
+
+        self.n_pushed += 1
+        if self.n_pushed < self.factor:
+            return None
+
+        self.n_pushed = 0
+
+        if self.mode == "last":
+            return row[np.newaxis, :]
+
+        if self.mode == "mean":
+            return (self.__sum / self.factor)[np.newaxis, :]
+
+        min_first = self.__i_min <= self.__i_max
+        rows = np.stack((
+
+            np.where(min_first, self.__min, self.__max),
+            np.where(min_first, self.__max, self.__min)
+
+        ))
+        rows[0, 0] = self.__t_first
+        rows[1, 0] = row[0]
+        return rows
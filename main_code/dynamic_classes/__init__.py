@@ -1,3 +1,4 @@
 from .dynamic_abstract_class import AbstractDynamicModel
 from .water_tank import WaterTankDynamicModel
-from .boiler_dynamics import BoilerDynamicModel
\ No newline at end of file
+from .boiler_dynamics import BoilerDynamicModel
+from .ensemble_models import AbstractEnsembleModel, WaterTankEnsembleModel, BoilerEnsembleModel
@@ -1,5 +1,7 @@
+from main_code.thermo_tools.saturation_table import SaturationTable
 from .dynamic_abstract_class import AbstractDynamicModel, keyboard
-from REFPROPConnector import ThermodynamicPoint
+from main_code.thermo_tools.backend import ThermodynamicPoint
+from scipy.optimize import brentq
 import numpy as np
 
 
@@ -14,16 +16,30 @@ class BoilerDynamicModel(AbstractDynamicModel):
     V_x0 = 0.5          # Initial Liquid Level [-]
     p_out = 0.101325    # Outlet Pressure [MPa]
 
+    T = 0.              # Exported variables (class values used for the buffer shapes before "initialize")
+    P = 0.
+    m_dot_out = 0.
+
+    use_saturation_table = False            # Use tabulated saturation properties instead of REFPROP flashes
+    saturation_table_range = (1., 370.)     # Saturation table temperature range [°C]
+    steady_state_T_range = (1., 370.)       # Temperatures searched by "get_steady_state" [°C]
+
+    profile_sections = ["flash_h_rho", "saturation", "m_out"]
+
     def __init__(self):
 
         self.thermo = None
         self.__tmp_thermo = None
+        self.saturation_table = None
 
     def init_internal_parameters(self):
 
         self.thermo = ThermodynamicPoint(["water"], [1])
         self.__tmp_thermo = ThermodynamicPoint(["water"], [1])
 
+        if self.use_saturation_table:
+            self.saturation_table = SaturationTable.load_or_build(["water"], [1], T_range=self.saturation_table_range)
+
         self.T = self.T_0
         self.V_x = self.V_x0
 
@@ -49,18 +65,23 @@ class BoilerDynamicModel(AbstractDynamicModel):
 
         self.__tmp_thermo.set_variable("P", self.p_in_max)
         self.__tmp_thermo.set_variable("Q", 1.)
-        rho_vap_max = self.thermo.get_variable("rho")
+        rho_vap_max = self.__tmp_thermo.get_variable("rho")
 
         self.yd_max = np.sqrt(self.p_in_max * 1e6 * rho_vap_max) / self.m_in_max
 
-    def evaluate_m_out(self, yd_perc):
+    def evaluate_m_out(self, yd_perc, p_in=None):
 
-        # Treated as a turbine (Stodola Curve)
-        p_in = self.thermo.get_variable("P")
+        # Treated as a turbine (Stodola Curve), at the current pressure if "p_in" is not given
+        if p_in is None:
+            p_in = self.P if self.saturation_table is not None else self.thermo.get_variable("P")
 
-        self.__tmp_thermo.set_variable("P", p_in)
-        self.thermo.set_variable("Q", 1.)
-        rho_vap = self.thermo.get_variable("rho")
+        if self.saturation_table is not None:
+            rho_vap = self.saturation_table.evaluate("rho_v", P=p_in)
+
+        else:
+            self.__tmp_thermo.set_variable("P", p_in)
+            self.__tmp_thermo.set_variable("Q", 1.)
+            rho_vap = self.__tmp_thermo.get_variable("rho")
 
         p_ratio = p_in / self.p_out
 
@@ -80,46 +101,154 @@ class BoilerDynamicModel(AbstractDynamicModel):
 
     def get_saturation_conditions(self, T):
 
+        if self.saturation_table is not None:
+            return self.saturation_table.saturation_conditions(T=T)
+
         self.thermo.set_variable("T", T)
         self.thermo.set_variable("Q", 0.)
 
         p_sat = self.thermo.get_variable("P")
         rho_liq = self.thermo.get_variable("rho")
-        h_liq = self.thermo.get_variable("rho")
+        h_liq = self.thermo.get_variable("h")
 
         self.thermo.set_variable("T", T)
         self.thermo.set_variable("Q", 1.)
         rho_vap = self.thermo.get_variable("rho")
-        h_vap = self.thermo.get_variable("rho")
+        h_vap = self.thermo.get_variable("h")
 
         return p_sat, rho_vap, rho_liq, h_liq, h_vap
 
-    def update_thermo(self, dt, shared_params=None):
+    def get_state(self) -> np.ndarray:
+        return np.array([self.m_in, self.h_in])
 
-        rho_mean = self.m_in / self.V_in
+    def set_state(self, state):
+        self.m_in, self.h_in = state[0], state[1]
 
-        self.thermo.set_variable("H", self.h_in)
-        self.thermo.set_variable("rho", rho_mean)
+    def derivatives(self, t, state, shared_params=None) -> np.ndarray:
 
-        self.T = self.thermo.get_variable("T")
-        self.P = self.thermo.get_variable("P")
+        m_in, h_in = state[0], state[1]
+        rho_mean = m_in / self.V_in
+
+        with self.profile("flash_h_rho"):
+
+            thermo_state = None
+            if self.saturation_table is not None:
+                thermo_state = self.saturation_table.two_phase_state(h_in, rho_mean)
+
+            if thermo_state is None:
+
+                self.thermo.set_variable("H", h_in)
+                self.thermo.set_variable("rho", rho_mean)
+
+                self.T = self.thermo.get_variable("T")
+                self.P = self.thermo.get_variable("P")
+
+            else:
+
+                self.T, self.P, x = thermo_state
+
+        with self.profile("saturation"):
+            p_sat, rho_vap, rho_liq, h_liq, h_vap = self.get_saturation_conditions(self.T)
 
-        p_sat, rho_vap, rho_liq, h_liq, h_vap = self.get_saturation_conditions(self.T)
         self.V_x = (rho_mean - rho_vap) / (rho_liq - rho_vap)
+        self.rho_liq = rho_liq
 
         if shared_params is not None:
             self.m_dot_in_perc = shared_params["m_in_perc"].value / 100
             self.yd_perc = shared_params["yd_perc"].value / 100
 
         self.m_dot_in = self.m_dot_in_perc * self.m_in_max
-        self.m_dot_out = self.evaluate_m_out(self.yd_perc)
+        with self.profile("m_out"):
+            self.m_dot_out = self.evaluate_m_out(self.yd_perc)
+
+        return np.array([
+
+            self.m_dot_in - self.m_dot_out,
+            (self.q_in - self.m_dot_out * h_vap + self.m_dot_in * h_liq) / m_in
+
+        ])
 
-        self.m_in = min(max(0., self.m_in + (self.m_dot_in - self.m_dot_out) * dt), self.V_in * rho_liq)
-        self.h_in += (self.q_in - self.m_dot_out * h_vap + self.m_dot_in * h_liq) * dt / self.m_in
+    def constrain_state(self, state) -> np.ndarray:
+
+        # The mass can not exceed the one of a volume full of liquid (at the last evaluated T)
+        return np.array([min(max(0., state[0]), self.V_in * self.rho_liq), state[1]])
+
+    def update_thermo(self, dt, shared_params=None):
+
+        # Explicit Euler step
+        state = self.get_state()
+        self.set_state(self.constrain_state(state + dt * self.derivatives(self.t, state, shared_params)))
 
     def export_variables(self) -> np.ndarray:
         return np.array([self.t, self.T, self.P, self.m_dot_out])
 
+    # <------------------------------------------------------------------------->
+    # STEADY STATE
+    # <------------------------------------------------------------------------->
+
+    STEADY_STATE_REGIMES = ["full", "draining", "none"]
+
+    def get_heat_balance(self, T, m_dot_in, yd_perc):
+
+        """
+            Steady energy balance (m_dot_out = m_dot_in) with saturated conditions at T [kW].
+            The state and the exported variables of the model are not modified (the
+            ThermodynamicPoint instances are used as scratch points).
+        """
+
+        p_sat, rho_vap, rho_liq, h_liq, h_vap = self.get_saturation_conditions(T)
+        m_dot_out = self.evaluate_m_out(yd_perc, p_in=p_sat)
+        return self.q_in + m_dot_in * h_liq - m_dot_out * h_vap, m_dot_out
+
+    def get_steady_state(self, m_in_perc, yd_perc, xtol=1e-6) -> dict:
+
+        """
+            Equilibrium for constant inputs, found without running the transient. In the
+            two-phase region the outlet flow depends on T only (P = P_sat(T)), hence the energy
+            balance gives T (root-finding in "steady_state_T_range"). Then the mass balance
+            sets the regime:
+
+                "full"      m_dot_in >= m_dot_out: the vessel fills up with saturated liquid
+                            (the state where the transient stops, the mass being limited)
+                "draining"  m_dot_in < m_dot_out: the vessel empties, no steady state
+                "none"      the energy balance has no solution in the temperature range
+
+            Returns a dictionary with T, P, m_dot_out, V_x and the state (m_in, h_in), the
+            values are NaN if there is no steady state.
+        """
+
+        if self.thermo is None:
+            self.initialize()
+
+        m_dot_in = m_in_perc / 100 * self.m_in_max
+        yd_perc = yd_perc / 100
+
+        def balance(T):
+            return self.get_heat_balance(T, m_dot_in, yd_perc)[0]
+
+        T_min, T_max = self.steady_state_T_range
+        result = {key: np.nan for key in ["T", "P", "m_dot_out", "V_x", "m_in", "h_in"]}
+
+        if balance(T_min) * balance(T_max) > 0:
+            result.update({"regime": "none"})
+            return result
+
+        T = brentq(balance, T_min, T_max, xtol=xtol)
+        heat_residual, m_dot_out = self.get_heat_balance(T, m_dot_in, yd_perc)
+
+        if m_dot_in < m_dot_out:
+            result.update({"regime": "draining"})
+            return result
+
+        p_sat, rho_vap, rho_liq, h_liq, h_vap = self.get_saturation_conditions(T)
+        result.update({
+
+            "T": T, "P": p_sat, "m_dot_out": m_dot_out, "V_x": 1.,
+            "m_in": rho_liq * self.V_in, "h_in": h_liq, "regime": "full"
+
+        })
+        return result
+
     def keyboard_listener(self, key_pressed, shared_params):
         if key_pressed == keyboard.Key.up:
             # Increase flow rate by 1% up to 100%
@@ -1,30 +1,160 @@
-from REFPROPConnector import DiagramPlotter
+from main_code.thermo_tools.cached_point import enable_thermo_cache
+from main_code.profiling import NO_PROFILER_SECTION
+from main_code.thermo_tools.backend import DiagramPlotter
+from main_code.lazy_import import LazyModule
 from abc import ABC, abstractmethod
-from pynput import keyboard
 import numpy as np
+import copy
+
+
+# Imported only by the processes reading the keyboard (never in headless runs)
+keyboard = LazyModule("pynput.keyboard")
 
 
 class AbstractDynamicModel(ABC):
 
     t = 0.0
 
+    use_thermo_cache = False        # Wrap the ThermodynamicPoint attributes in a memoising cache
+    thermo_cache_size = 10000       # Maximum number of cached properties (for each fluid)
+    thermo_cache_digits = 6         # Significant digits of the cached inputs (accuracy vs hit ratio, see CachedThermodynamicPoint)
+    thermo_caches = None
+
+    integrator = None               # None: the model advances itself in "update_thermo" (see main_code.integrators)
+                                    # (an integrator set on the class is copied by each instance in "initialize")
+
+    step_cache = None               # Properties already read in the current step (see "get_step_variable")
+
+    profiler = None                 # StepProfiler attached by the worker when CalculatorOptions.profile is set
+    profile_sections = list()       # Sections timed with "self.profile(name)" to be shown on the dashboard
+
     def initialize(self):
         self.t = 0.0
+        self.step_cache = dict()
         self.init_internal_parameters()
 
+        # Adaptive integrators keep their step between calls: each instance needs its own one
+        if self.integrator is not None:
+
+            if "integrator" not in vars(self):
+                self.integrator = copy.deepcopy(self.integrator)
+
+            self.integrator.reset()
+
+        if self.use_thermo_cache:
+            self.thermo_caches = enable_thermo_cache(
+
+                self, max_size=self.thermo_cache_size,
+                significant_digits=self.thermo_cache_digits
+
+            )
+
+    def initialize_role(self, role):
+
+        """
+            Initialization needed by a process of the simulation ("worker", "plot", "recorder"
+            ...). Only the worker needs the state of the model: the other processes only use the
+            labels and the buffer shapes (evaluated by the launching process before "initialize"),
+            so they do not create any ThermodynamicPoint.
+        """
+
+        if role == "worker":
+            self.initialize()
+
     @abstractmethod
     def init_internal_parameters(self):
         pass
 
     def update(self, dt, shared_params=None):
 
-        self.t += dt
-        self.update_thermo(dt, shared_params)
+        # The properties read in the previous step refer to the old state
+        self.step_cache.clear()
+
+        if self.integrator is None:
+            self.t += dt
+            self.update_thermo(dt, shared_params)
+
+        else:
+            self.integrate(dt, shared_params)
+
+    def integrate(self, dt, shared_params=None):
+
+        """Advances the state returned by "get_state" with the selected integrator."""
+
+        t_start = self.t
+        state = self.integrator.step(
+
+            lambda t, y: self.derivatives(t, y, shared_params),
+            t_start, self.get_state(), dt
+
+        )
+
+        self.t = t_start + dt
+        self.set_state(self.constrain_state(state))
+
+        # Evaluated once more so that the algebraic variables (exported) refer to the new state
+        self.derivatives(self.t, state, shared_params)
 
     @abstractmethod
     def update_thermo(self, dt, shared_params=None):
         pass
 
+    def get_step_variable(self, point, variable_name):
+
+        """
+            "point.get_variable(variable_name)" evaluated at most once per step: further reads
+            (e.g. in "export_thermo_plot_variables") return the stored value until the next
+            "update". Use it only after the point has reached its final state in the step.
+        """
+
+        # Not initialized as a worker (e.g. a point created only for the thermodynamic diagram)
+        if self.step_cache is None:
+            return point.get_variable(variable_name)
+
+        key = (id(point), variable_name.lower())
+        if key not in self.step_cache:
+            self.step_cache[key] = point.get_variable(variable_name)
+
+        return self.step_cache[key]
+
+    def profile(self, name):
+
+        """
+            Times a section of the model code when profiling is active:
+
+                with self.profile("flash"):
+                    self.tp.set_variable(...)
+        """
+
+        if self.profiler is None:
+            return NO_PROFILER_SECTION
+
+        return self.profiler.section(name)
+
+    def get_state(self) -> np.ndarray:
+        raise NotImplementedError("{} does not expose its state".format(type(self).__name__))
+
+    def set_state(self, state):
+        raise NotImplementedError("{} does not expose its state".format(type(self).__name__))
+
+    def constrain_state(self, state) -> np.ndarray:
+
+        """
+            Physical limits applied to the state at the end of each step (e.g. the mass of a
+            vessel full of liquid), with any integrator and in "update_thermo".
+        """
+
+        return state
+
+    def derivatives(self, t, state, shared_params=None) -> np.ndarray:
+
+        """
+            Time derivatives of "state" (same shape). Implementations must also update the
+            algebraic variables of the model (the ones returned by "export_variables").
+        """
+
+        raise NotImplementedError("{} does not expose its derivatives".format(type(self).__name__))
+
     @abstractmethod
     def export_variables(self) -> np.ndarray:
         pass
@@ -71,6 +201,21 @@ class AbstractDynamicModel(ABC):
 
 
 class AbstractDynamicModelThermo(AbstractDynamicModel, ABC):
+
+    def initialize_role(self, role):
+
+        if role == "thermo_plot":
+            self.init_diagram_support()
+
+        else:
+            super().initialize_role(role)
+
+    def init_diagram_support(self):
+
+        """What "init_diagram_plotter" needs (by default the whole model)."""
+
+        self.initialize()
+
     @abstractmethod
     def export_thermo_plot_variables(self) -> np.ndarray:
         return np.array([])
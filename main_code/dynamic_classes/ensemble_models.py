@@ -0,0 +1,177 @@
+from main_code.thermo_tools.saturation_table import SaturationTable
+from .dynamic_abstract_class import AbstractDynamicModel
+from .boiler_dynamics import BoilerDynamicModel
+from .water_tank import WaterTankDynamicModel
+from abc import ABC
+import numpy as np
+
+
+class AbstractEnsembleModel(AbstractDynamicModel, ABC):
+
+    """
+        Model advancing "n_members" instances at once: the state is stored in arrays of shape
+        (n_members,) and "export_variables" returns a (n_members, n_elements) block.
+
+        Every class attribute of the model can be given a different value for each member as
+        a keyword argument (e.g. "WaterTankEnsembleModel(100, a_out=np.linspace(0.001, 0.01, 100))").
+        The shared params are applied to all the members unless their value is an array.
+    """
+
+    def __init__(self, n_members=1, **member_params):
+
+        self.n_members = int(n_members)
+        self.member_params = dict()
+
+        for key, value in member_params.items():
+
+            if not hasattr(type(self), key):
+                raise AttributeError("{} has no parameter '{}'".format(type(self).__name__, key))
+
+            self.member_params.update({key: np.asarray(value, dtype=float)})
+
+    def get_member_param(self, name) -> np.ndarray:
+
+        value = self.member_params.get(name, getattr(type(self), name))
+        return np.broadcast_to(np.asarray(value, dtype=float), (self.n_members,))
+
+    def get_shared_value(self, shared_params, name, default) -> np.ndarray:
+
+        if shared_params is None:
+            value = default
+
+        else:
+            value = shared_params[name].value
+
+        return np.broadcast_to(np.asarray(value, dtype=float), (self.n_members,))
+
+    def stack_variables(self, *variables) -> np.ndarray:
+
+        columns = [np.broadcast_to(np.asarray(variable, dtype=float), (self.n_members,)) for variable in variables]
+        return np.column_stack(columns)
+
+
+class WaterTankEnsembleModel(AbstractEnsembleModel, WaterTankDynamicModel):
+
+    def init_internal_parameters(self):
+
+        self.h = np.zeros(self.n_members)
+        self.m_in = np.zeros(self.n_members)
+
+    def get_state(self) -> np.ndarray:
+        return self.h.copy()
+
+    def set_state(self, state):
+        self.h = np.asarray(state, dtype=float).copy()
+
+    def derivatives(self, t, state, shared_params=None) -> np.ndarray:
+
+        rho = self.get_member_param("rho")
+        m_in_max = self.get_member_param("m_in_max")
+
+        v_out = np.sqrt(2 * self.get_member_param("g") * np.maximum(state, 0.))
+        m_out = rho * v_out * self.get_member_param("a_out")
+
+        self.m_in = self.get_shared_value(shared_params, "m_in_perc", 50.) / 100 * m_in_max
+        return (self.m_in - m_out) / (rho * self.get_member_param("a_int"))
+
+    def update_thermo(self, dt, shared_params=None):
+
+        # Explicit Euler step
+        self.h = self.h + self.derivatives(self.t, self.h, shared_params) * dt
+
+    def export_variables(self) -> np.ndarray:
+        return self.stack_variables(self.t, self.h, self.m_in)
+
+
+class BoilerEnsembleModel(AbstractEnsembleModel, BoilerDynamicModel):
+
+    """
+        Ensemble version of BoilerDynamicModel evaluated on a SaturationTable (no REFPROP call
+        during the steps). Members leaving the saturation dome can not be described by the
+        table and are set to NaN from that step on.
+    """
+
+    def __init__(self, n_members=1, **member_params):
+
+        super().__init__(n_members, **member_params)
+        self.saturation_table = None
+
+    def init_internal_parameters(self):
+
+        self.saturation_table = SaturationTable.load_or_build(["water"], [1], T_range=self.saturation_table_range)
+
+        self.T = self.get_member_param("T_0").copy()
+        self.V_x = self.get_member_param("V_x0").copy()
+        V_in = self.get_member_param("V_in")
+
+        self.m_dot_in_perc = 0.2
+        self.yd_perc = 0.8
+
+        self.P, rho_vap, rho_liq, h_liq, h_vap = self.saturation_table.saturation_conditions(T=self.T)
+        self.m_dot_in = np.zeros(self.n_members)
+        self.m_dot_out = np.zeros(self.n_members)
+
+        self.m_in = (rho_liq * self.V_x + rho_vap * (1 - self.V_x)) * V_in
+        x_in = rho_vap * (1 - self.V_x) * V_in / self.m_in
+        self.h_in = h_liq * (1 - x_in) + h_vap * x_in
+
+        p_in_max = self.get_member_param("p_in_max")
+        rho_vap_max = self.saturation_table.evaluate("rho_v", P=p_in_max)
+        self.yd_max = np.sqrt(p_in_max * 1e6 * rho_vap_max) / self.get_member_param("m_in_max")
+
+    def evaluate_m_out(self, yd_perc):
+
+        # Treated as a turbine (Stodola Curve), see BoilerDynamicModel.evaluate_m_out
+        p_in = self.P
+        rho_vap = self.saturation_table.evaluate("rho_v", P=p_in)
+        p_ratio = p_in / self.get_member_param("p_out")
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            phi_sqr = np.where(yd_perc > 0, (1 - 1 / p_ratio ** 2) * yd_perc / self.yd_max, 0.)
+            m_out = np.sqrt(phi_sqr * p_in ** 2 * rho_vap)
+
+        return np.where(p_ratio < 1, 0., m_out)
+
+    def get_state(self) -> np.ndarray:
+        return np.stack([self.m_in, self.h_in])
+
+    def set_state(self, state):
+        self.m_in, self.h_in = np.array(state[0], dtype=float), np.array(state[1], dtype=float)
+
+    def derivatives(self, t, state, shared_params=None) -> np.ndarray:
+
+        m_in, h_in = state[0], state[1]
+        rho_mean = m_in / self.get_member_param("V_in")
+
+        self.T, self.P, x = self.saturation_table.two_phase_states(h_in, rho_mean)
+        p_sat, rho_vap, rho_liq, h_liq, h_vap = self.saturation_table.saturation_conditions(T=self.T)
+        self.V_x = (rho_mean - rho_vap) / (rho_liq - rho_vap)
+        self.rho_liq = rho_liq
+
+        m_dot_in_perc = self.get_shared_value(shared_params, "m_in_perc", self.m_dot_in_perc * 100) / 100
+        yd_perc = self.get_shared_value(shared_params, "yd_perc", self.yd_perc * 100) / 100
+
+        self.m_dot_in = m_dot_in_perc * self.get_member_param("m_in_max")
+        self.m_dot_out = self.evaluate_m_out(yd_perc)
+
+        return np.stack([
+
+            self.m_dot_in - self.m_dot_out,
+            (self.get_member_param("q_in") - self.m_dot_out * h_vap + self.m_dot_in * h_liq) / m_in
+
+        ])
+
+    def constrain_state(self, state) -> np.ndarray:
+
+        # The mass can not exceed the one of a volume full of liquid (at the last evaluated T)
+        V_in = self.get_member_param("V_in")
+        return np.stack([np.minimum(np.maximum(0., state[0]), V_in * self.rho_liq), state[1]])
+
+    def update_thermo(self, dt, shared_params=None):
+
+        # Explicit Euler step
+        state = self.get_state()
+        self.set_state(self.constrain_state(state + dt * self.derivatives(self.t, state, shared_params)))
+
+    def export_variables(self) -> np.ndarray:
+        return self.stack_variables(self.t, self.T, self.P, self.m_dot_out)
@@ -1,5 +1,6 @@
 from main_code.dynamic_classes.dynamic_abstract_class import AbstractDynamicModelThermo, keyboard
-from REFPROPConnector import DiagramPlotter, DiagramPlotterOptions
+from main_code.thermo_tools.backend import DiagramPlotter, DiagramPlotterOptions, ThermodynamicPoint
+from main_code.thermo_tools.saturation_table import SaturationTable
 from abc import ABC
 import numpy as np
 
@@ -9,14 +10,40 @@ class AbstractStudentClass(AbstractDynamicModelThermo, ABC):
     V_x = 0.5
     p_sat = 0.00
     tp = None
+    fluid = None                    # Fluid of "tp": if set, the diagram is initialized without the whole model
+
+    use_saturation_table = False    # Use tabulated saturation properties instead of REFPROP flashes
+    saturation_table = None
+
+    def init_saturation_table(self, T_range, n_points=300):
+
+        # Built from the fluid of "self.tp" (loaded from the disk cache if already calculated)
+        if self.use_saturation_table:
+
+            self.saturation_table = SaturationTable.load_or_build(
+
+                self.tp.RPHandler.fluids, self.tp.RPHandler.composition,
+                T_range=T_range, n_points=n_points
+
+            )
 
     def export_thermo_plot_variables(self) -> np.ndarray:
 
+        # Read through the step cache: no new REFPROP call if "update_thermo" already read them
         if self.tp is not None:
-            return np.array([self.tp.get_variable("rho"), self.tp.get_variable("P")])
+            return np.array([self.get_step_variable(self.tp, "rho"), self.get_step_variable(self.tp, "P")])
         else:
             return np.array([0., 0.])
 
+    def init_diagram_support(self):
+
+        # The diagram only needs a point of the fluid (no saturation table, no initial state)
+        if self.fluid is not None:
+            self.tp = ThermodynamicPoint([self.fluid], [1.])
+
+        else:
+            super().init_diagram_support()
+
     def init_diagram_plotter(self) -> DiagramPlotter:
 
         __tpm_tp = self.tp.duplicate()
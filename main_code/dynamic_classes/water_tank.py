@@ -16,9 +16,15 @@ class WaterTankDynamicModel(AbstractDynamicModel):
         self.h = 0.
         self.m_in = 0.
 
-    def update_thermo(self, dt, shared_params=None):
+    def get_state(self) -> np.ndarray:
+        return np.array([self.h])
+
+    def set_state(self, state):
+        self.h = state[0]
+
+    def derivatives(self, t, state, shared_params=None) -> np.ndarray:
 
-        v_out = np.sqrt(2 * self.g * self.h)
+        v_out = np.sqrt(2 * self.g * state[0])
         if np.isnan(v_out):
             v_out = 0.
 
@@ -30,7 +36,12 @@ class WaterTankDynamicModel(AbstractDynamicModel):
         else:
             self.m_in = (shared_params["m_in_perc"].value / 100) * self.m_in_max
 
-        self.h += (self.m_in - m_out) * dt / (self.rho * self.a_int)
+        return np.array([(self.m_in - m_out) / (self.rho * self.a_int)])
+
+    def update_thermo(self, dt, shared_params=None):
+
+        # Explicit Euler step
+        self.h += self.derivatives(self.t, self.get_state(), shared_params)[0] * dt
 
     def export_variables(self) -> np.ndarray:
         return np.array([self.t, self.h, self.m_in])
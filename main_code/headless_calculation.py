@@ -0,0 +1,142 @@
+from main_code.dynamic_classes.dynamic_abstract_class import AbstractDynamicModel
+from main_code.input_schedule import InputRecording
+import numpy as np
+
+
+class HeadlessParam:
+
+    """Plain replacement of a multiprocessing.Value used when no other process is involved."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return "HeadlessParam({})".format(self.value)
+
+
+def init_headless_params(model: AbstractDynamicModel, initial_values=None) -> dict:
+
+    shared_params = {
+
+        "dt_%": HeadlessParam(1.),
+        "pause": HeadlessParam(False)
+
+    }
+
+    main_shared_param = model.get_shared_params()
+    if initial_values is not None:
+        main_shared_param.update(initial_values)
+
+    for key in main_shared_param:
+        shared_params.update({key: HeadlessParam(main_shared_param[key])})
+
+    return shared_params
+
+
+def apply_schedule(schedule, shared_params, t):
+
+    # Each entry can be a constant or a function of the simulated time
+    for key, value in schedule.items():
+
+        if callable(value):
+            shared_params[key].value = value(t)
+
+        else:
+            shared_params[key].value = value
+
+
+def run_headless(
+
+        model: AbstractDynamicModel, dt, horizon, schedule=None,
+        initial_values=None, initialize=True, stop_on_error=False
+
+) -> np.ndarray:
+
+    """
+        Advance the model for "horizon" seconds of simulated time as fast as possible
+        (no sleep, no plot and no keyboard processes). Returns an array whose rows are
+        the values returned by "model.export_variables()" after each step.
+
+        "schedule" is an optional dictionary {shared param name: value or f(t)} evaluated
+        before every step. If "stop_on_error" is True, a failing step (e.g. a REFPROP flash
+        outside the valid range) ends the run and only the completed rows are returned.
+    """
+
+    if initialize:
+        model.initialize()
+
+    shared_params = init_headless_params(model, initial_values)
+
+    if schedule is not None:
+        for key in schedule:
+            if key not in shared_params:
+                raise KeyError("'{}' is not a shared parameter of {}".format(key, type(model).__name__))
+
+    def get_dt(i):
+
+        if schedule is not None:
+            apply_schedule(schedule, shared_params, model.t)
+
+        return dt
+
+    n_steps = int(np.ceil(horizon / dt - 1e-9))
+    return run_steps(model, shared_params, n_steps, get_dt, stop_on_error)
+
+
+def replay_headless(model: AbstractDynamicModel, recording: InputRecording, initialize=True, stop_on_error=False) -> np.ndarray:
+
+    """
+        Repeats a live run whose inputs were saved with CalculatorOptions.input_record_file
+        ("recording" is an InputRecording or the CSV file) as fast as possible: the recorded
+        params are applied at the same steps, with the same time steps, hence the results are
+        the ones of the live run (same rows as "run_headless").
+    """
+
+    if not isinstance(recording, InputRecording):
+        recording = InputRecording.load(recording)
+
+    if initialize:
+        model.initialize()
+
+    shared_params = init_headless_params(model)
+    events = recording.get_events()
+    current_dt = [0.]
+
+    def get_dt(i):
+
+        if i in events:
+
+            current_dt[0], values = events[i]
+            for key, value in values.items():
+                shared_params[key].value = value
+
+        return current_dt[0]
+
+    return run_steps(model, shared_params, recording.n_steps, get_dt, stop_on_error)
+
+
+def run_steps(model: AbstractDynamicModel, shared_params: dict, n_steps, get_dt, stop_on_error=False) -> np.ndarray:
+
+    """"get_dt(i)" sets the inputs of step i and returns its time step."""
+
+    # Ensemble models export a (n_members, n_elements) block for each step
+    export_shape = np.shape(model.export_variables())
+    results = np.full((n_steps,) + export_shape, np.nan)
+
+    for i in range(n_steps):
+
+        dt = get_dt(i)
+
+        try:
+            model.update(dt, shared_params)
+
+        except Exception:
+
+            if stop_on_error:
+                return results[:i]
+
+            raise
+
+        results[i] = model.export_variables()
+
+    return results
@@ -0,0 +1,109 @@
+from main_code.ring_buffer import SharedRingBuffer
+from main_code.decimation import Decimator
+import numpy as np
+
+
+class HistoryPyramid:
+
+    """
+        Set of SharedRingBuffer of the same size: level 0 contains the rows at full resolution,
+        level k one row for every factor ** k rows of level 0 (in "minmax" mode the two rows
+        of the envelope of 2 * factor ** k rows). Each level therefore covers a time span
+        factor times longer than the previous one for the same number of rows to be drawn.
+    """
+
+    def __init__(self, rings: list, factor=10):
+
+        self.rings = list(rings)
+        self.factor = int(factor)
+
+    @property
+    def n_levels(self) -> int:
+        return len(self.rings)
+
+    @classmethod
+    def create_levels(cls, shape, n_levels, dtype=np.float64) -> list:
+
+        """Rings of the levels above 0 (the level 0 ring is the main buffer)."""
+
+        return [SharedRingBuffer.create(shape, dtype=dtype) for i in range(1, n_levels)]
+
+    @classmethod
+    def attach(cls, main_ring: SharedRingBuffer, level_names: list, factor=10):
+
+        rings = [main_ring]
+        for name in level_names:
+            rings.append(SharedRingBuffer.attach(name, main_ring.shape, dtype=main_ring.dtype))
+
+        return cls(rings, factor)
+
+    def get_writer(self, mode="minmax"):
+        return PyramidWriter(self, mode)
+
+    def __covers(self, level, t_start) -> bool:
+
+        ring = self.rings[level]
+        if ring.count <= ring.size:
+            # Never overwritten: it contains everything since the beginning
+            return True
+
+        older, newer = ring.segments()
+        oldest = older[0, 0] if len(older) > 0 else newer[0, 0]
+        return oldest <= t_start
+
+    def select_level(self, time_span) -> int:
+
+        """Finest level containing the last "time_span" seconds."""
+
+        rows = self.rings[0].read(max_rows=1)
+        if len(rows) == 0 or time_span is None:
+            return 0
+
+        t_start = rows[-1, 0] - time_span
+        for level in range(self.n_levels):
+            if self.__covers(level, t_start):
+                return level
+
+        return self.n_levels - 1
+
+    def read_span(self, time_span) -> np.ndarray:
+
+        """Rows of the last "time_span" seconds taken from the most suitable level."""
+
+        level = self.select_level(time_span)
+        rows = self.rings[level].read()
+
+        if time_span is None or len(rows) == 0:
+            return rows
+
+        return rows[rows[:, 0] >= rows[-1, 0] - time_span]
+
+
+class PyramidWriter:
+
+    """Fills all the levels of a HistoryPyramid incrementally from the level 0 rows."""
+
+    def __init__(self, pyramid: HistoryPyramid, mode="minmax"):
+
+        self.pyramid = pyramid
+
+        # The blocks giving two rows ("minmax") are twice as long, so that each level still
+        # covers "factor" times the span of the previous one
+        rows_per_block = Decimator(mode=mode).rows_per_block
+        self.decimators = [
+
+            Decimator(pyramid.factor ** level * rows_per_block, mode=mode)
+            for level in range(1, pyramid.n_levels)
+
+        ]
+
+    def write_rows(self, rows):
+
+        self.pyramid.rings[0].write_rows(rows)
+
+        for decimator, ring in zip(self.decimators, self.pyramid.rings[1:]):
+            for row in rows:
+
+                decimated_rows = decimator.push(row)
+                if decimated_rows is not None:
+                    ring.write_rows(decimated_rows)
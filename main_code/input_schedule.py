@@ -0,0 +1,223 @@
+from abc import ABC, abstractmethod
+import numpy as np
+
+
+class AbstractInputSchedule(ABC):
+
+    """
+        Value of a shared param as a function of the simulated time. Schedules are callables,
+        so they can be used in the "schedule" of run_headless and in CalculatorOptions.input_schedule:
+
+            schedule = {"m_in_perc": RampSchedule(10., 80., t_start=50., t_end=150.)}
+    """
+
+    def __call__(self, t):
+        return self.get_value(t)
+
+    @abstractmethod
+    def get_value(self, t):
+        pass
+
+
+class StepSchedule(AbstractInputSchedule):
+
+    def __init__(self, initial_value, final_value, t_step):
+
+        self.initial_value = initial_value
+        self.final_value = final_value
+        self.t_step = t_step
+
+    def get_value(self, t):
+        return self.initial_value if t < self.t_step else self.final_value
+
+
+class RampSchedule(AbstractInputSchedule):
+
+    """Linear change from "initial_value" (up to "t_start") to "final_value" (from "t_end")."""
+
+    def __init__(self, initial_value, final_value, t_start, t_end):
+
+        self.initial_value = initial_value
+        self.final_value = final_value
+        self.t_start = t_start
+        self.t_end = t_end
+
+    def get_value(self, t):
+
+        if t <= self.t_start:
+            return self.initial_value
+
+        if t >= self.t_end:
+            return self.final_value
+
+        return self.initial_value + (self.final_value - self.initial_value) * (t - self.t_start) / (self.t_end - self.t_start)
+
+
+class PiecewiseLinearSchedule(AbstractInputSchedule):
+
+    """
+        Values given at increasing times, interpolated linearly ("linear") or held until the
+        next time ("previous", e.g. for recorded keyboard inputs). The first and last values
+        are held before and after the given times.
+    """
+
+    INTERPOLATIONS = ["linear", "previous"]
+
+    def __init__(self, times, values, interpolation="linear"):
+
+        if interpolation not in self.INTERPOLATIONS:
+            raise ValueError("Unknown interpolation '{}' (use one of {})".format(interpolation, self.INTERPOLATIONS))
+
+        self.times = np.asarray(times, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+        self.interpolation = interpolation
+
+        if len(self.times) == 0 or not len(self.times) == len(self.values):
+            raise ValueError("times and values must be non empty and of the same length")
+
+        if np.any(np.diff(self.times) < 0):
+            raise ValueError("times must be increasing")
+
+    @classmethod
+    def from_csv(cls, file_path, column, time_column="t", interpolation="linear"):
+        return load_schedule_csv(file_path, time_column=time_column, interpolation=interpolation)[column]
+
+    def get_value(self, t):
+
+        if self.interpolation == "previous":
+            index = max(np.searchsorted(self.times, t, side="right") - 1, 0)
+            return float(self.values[index])
+
+        return float(np.interp(t, self.times, self.values))
+
+
+def read_csv_columns(file_path) -> dict:
+
+    """{column name: array} of a comma separated file with a header line."""
+
+    with open(file_path, "r") as file:
+        header = [name.strip() for name in file.readline().split(",")]
+
+    data = np.loadtxt(file_path, delimiter=",", skiprows=1, ndmin=2)
+    return {name: data[:, i] for i, name in enumerate(header)}
+
+
+def load_schedule_csv(file_path, time_column="t", interpolation="linear") -> dict:
+
+    """
+        Schedules of all the columns of a CSV file (except the time), e.g.:
+
+            t,m_in_perc,yd_perc
+            0,10,50
+            100,80,50
+            200,80,20
+
+        returns {"m_in_perc": PiecewiseLinearSchedule, "yd_perc": PiecewiseLinearSchedule}.
+    """
+
+    columns = read_csv_columns(file_path)
+    times = columns.pop(time_column)
+    return {name: PiecewiseLinearSchedule(times, values, interpolation) for name, values in columns.items()}
+
+
+# <----------------------------------------------------------------------------->
+# RECORDING AND REPLAY
+# <----------------------------------------------------------------------------->
+
+class InputRecorder:
+
+    """
+        Records the inputs of a live run (keyboard or schedule) in the worker: a row is added
+        each time the values change, with the index of the step and its time step, so that
+        the run can be repeated exactly by "replay_headless".
+    """
+
+    def __init__(self, keys: list):
+
+        self.keys = list(keys)
+        self.rows = list()
+        self.last_values = None
+        self.n_steps = 0
+
+    def record(self, t, dt, shared_params):
+
+        """To be called before each step with the params and the time step used by the step."""
+
+        values = tuple([dt] + [shared_params[key].value for key in self.keys])
+        if not values == self.last_values:
+            self.rows.append((self.n_steps, t) + values)
+            self.last_values = values
+
+        self.n_steps += 1
+
+    def get_recording(self):
+
+        rows = list(self.rows)
+
+        # The last row marks the end of the run (the values are the last ones used)
+        if self.last_values is not None:
+            rows.append((self.n_steps, np.nan) + self.last_values)
+
+        return InputRecording(self.keys, np.array(rows, dtype=float).reshape(-1, 3 + len(self.keys)))
+
+    def save(self, file_path):
+        self.get_recording().save(file_path)
+
+
+class InputRecording:
+
+    COLUMNS = ["step", "t", "dt"]
+
+    def __init__(self, keys: list, rows: np.ndarray):
+
+        self.keys = list(keys)
+        self.rows = rows
+
+    @classmethod
+    def load(cls, file_path):
+
+        columns = read_csv_columns(file_path)
+        keys = [name for name in columns.keys() if name not in cls.COLUMNS]
+        rows = np.column_stack([columns[name] for name in cls.COLUMNS + keys])
+        return cls(keys, rows)
+
+    def save(self, file_path):
+
+        # Full precision, so that the time steps of the replay are exactly the recorded ones
+        np.savetxt(file_path, self.rows, delimiter=",", fmt="%.17g", header=",".join(self.COLUMNS + self.keys), comments="")
+
+    @property
+    def n_steps(self) -> int:
+        return int(self.rows[-1, 0]) if len(self.rows) > 0 else 0
+
+    @property
+    def duration(self) -> float:
+        return float(np.nansum(self.get_step_dts()))
+
+    def get_events(self) -> dict:
+
+        """{step: (dt, {param: value})} of the steps at which the inputs change."""
+
+        return {
+
+            int(row[0]): (row[2], {key: row[3 + i] for i, key in enumerate(self.keys)})
+            for row in self.rows[:-1]
+
+        }
+
+    def get_step_dts(self) -> np.ndarray:
+
+        steps = self.rows[:, 0].astype(int)
+        return np.repeat(self.rows[:-1, 2], np.diff(steps))
+
+    def get_schedules(self) -> dict:
+
+        """The inputs as functions of the simulated time (to play the recording in a live run)."""
+
+        times = self.rows[:-1, 1]
+        return {
+
+            key: PiecewiseLinearSchedule(times, self.rows[:-1, 3 + i], interpolation="previous")
+            for i, key in enumerate(self.keys)
+
+        }
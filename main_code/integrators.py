@@ -0,0 +1,188 @@
+from scipy.integrate import solve_ivp
+from abc import ABC, abstractmethod
+import numpy as np
+
+
+class AbstractIntegrator(ABC):
+
+    """
+        Advances "y" from "t" to "t + dt" given the derivative function "f(t, y) -> dy/dt".
+        The number of derivative evaluations (i.e. of model flashes) is stored in "n_evaluations".
+    """
+
+    def __init__(self):
+        self.n_evaluations = 0
+
+    def reset(self):
+
+        """Forgets the state kept between the steps (called when the model is initialized)."""
+
+        self.n_evaluations = 0
+
+    def evaluate(self, f, t, y) -> np.ndarray:
+
+        self.n_evaluations += 1
+        return np.asarray(f(t, y), dtype=float)
+
+    @abstractmethod
+    def step(self, f, t, y, dt) -> np.ndarray:
+        pass
+
+
+class ExplicitEuler(AbstractIntegrator):
+
+    def step(self, f, t, y, dt) -> np.ndarray:
+        return y + dt * self.evaluate(f, t, y)
+
+
+class RK4(AbstractIntegrator):
+
+    def step(self, f, t, y, dt) -> np.ndarray:
+
+        k1 = self.evaluate(f, t, y)
+        k2 = self.evaluate(f, t + dt / 2, y + dt / 2 * k1)
+        k3 = self.evaluate(f, t + dt / 2, y + dt / 2 * k2)
+        k4 = self.evaluate(f, t + dt, y + dt * k3)
+
+        return y + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+class RK45(AbstractIntegrator):
+
+    """
+        Embedded Dormand-Prince 5(4) scheme. Each call is split in adaptive sub-steps whose length
+        is controlled by the local error estimate and kept between successive calls. A sub-step in
+        which the model fails (exception or non finite derivatives) is rejected and shortened.
+    """
+
+    c = np.array([0., 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1., 1.])
+    a = [
+
+        [],
+        [1 / 5],
+        [3 / 40, 9 / 40],
+        [44 / 45, -56 / 15, 32 / 9],
+        [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+        [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+        [35 / 384, 0., 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84]
+
+    ]
+    b = np.array([35 / 384, 0., 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0.])
+    b_star = np.array([5179 / 57600, 0., 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40])
+
+    def __init__(self, rtol=1e-6, atol=1e-9, min_step=1e-9, max_substeps=100000):
+
+        super().__init__()
+
+        self.rtol = rtol
+        self.atol = atol
+        self.min_step = min_step
+        self.max_substeps = max_substeps
+
+        self.h = None
+        self.n_accepted = 0
+        self.n_rejected = 0
+
+    def reset(self):
+
+        super().reset()
+
+        self.h = None
+        self.n_accepted = 0
+        self.n_rejected = 0
+
+    def __try_substep(self, f, t, y, h):
+
+        k = list()
+        for i in range(7):
+
+            y_stage = y + h * sum(a_ij * k_j for a_ij, k_j in zip(self.a[i], k)) if i > 0 else y
+            k.append(self.evaluate(f, t + self.c[i] * h, y_stage))
+
+        y_new = y + h * sum(b_i * k_i for b_i, k_i in zip(self.b, k))
+        y_err = h * sum((b_i - b_star_i) * k_i for b_i, b_star_i, k_i in zip(self.b, self.b_star, k))
+
+        scale = self.atol + self.rtol * np.maximum(np.abs(y), np.abs(y_new))
+        error = np.sqrt(np.mean((y_err / scale) ** 2))
+        return y_new, error
+
+    def step(self, f, t, y, dt) -> np.ndarray:
+
+        y = np.asarray(y, dtype=float)
+        t_end = t + dt
+
+        if self.h is None:
+            self.h = dt
+
+        n_substeps = 0
+        while t < t_end - 1e-12 * abs(dt):
+
+            h = min(self.h, t_end - t)
+
+            try:
+                y_new, error = self.__try_substep(f, t, y, h)
+
+            except Exception:
+                y_new, error = None, np.inf
+
+            if y_new is not None and np.isfinite(error) and np.all(np.isfinite(y_new)) and error <= 1.:
+
+                t += h
+                y = y_new
+                self.n_accepted += 1
+                factor = 5. if error == 0 else min(5., max(0.2, 0.9 * error ** -0.2))
+
+            else:
+
+                self.n_rejected += 1
+                factor = 0.25 if not np.isfinite(error) else max(0.2, 0.9 * error ** -0.25)
+
+            self.h = h * factor
+            n_substeps += 1
+
+            if self.h < self.min_step or n_substeps > self.max_substeps:
+                raise RuntimeError("RK45 failed at t={:.6g} (step {:.3g})".format(t, self.h))
+
+        return y
+
+
+class BDF(AbstractIntegrator):
+
+    """Implicit variable order BDF scheme (scipy "solve_ivp") for stiff models."""
+
+    def __init__(self, rtol=1e-6, atol=1e-9):
+
+        super().__init__()
+
+        self.rtol = rtol
+        self.atol = atol
+        self.h = None
+
+    def reset(self):
+
+        super().reset()
+        self.h = None
+
+    def step(self, f, t, y, dt) -> np.ndarray:
+
+        y = np.asarray(y, dtype=float)
+        shape = y.shape
+
+        def flat_f(t_curr, y_flat):
+            return self.evaluate(f, t_curr, y_flat.reshape(shape)).ravel()
+
+        solution = solve_ivp(
+
+            flat_f, (t, t + dt), y.ravel(), method="BDF",
+            rtol=self.rtol, atol=self.atol,
+            first_step=None if self.h is None else min(self.h, dt)
+
+        )
+
+        if not solution.success:
+            raise RuntimeError("BDF failed at t={:.6g}: {}".format(t, solution.message))
+
+        if len(solution.t) > 1:
+            self.h = solution.t[-1] - solution.t[-2]
+
+        return solution.y[:, -1].reshape(shape)
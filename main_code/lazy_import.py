@@ -0,0 +1,35 @@
+import importlib
+
+
+class LazyModule:
+
+    """
+        Stand-in for a module imported on the first attribute access, e.g.:
+
+            plt = LazyModule("matplotlib.pyplot")
+
+        Processes that never use the module (headless runs, the calculation worker ...) never
+        pay for its import. Import errors are raised at the first use, not at import time.
+    """
+
+    def __init__(self, name):
+        self.__name = name
+        self.__module = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__module is not None
+
+    def load(self):
+
+        if self.__module is None:
+            self.__module = importlib.import_module(self.__name)
+
+        return self.__module
+
+    def __getattr__(self, attribute):
+        return getattr(self.load(), attribute)
+
+    def __repr__(self):
+        return "LazyModule('{}', loaded={})".format(self.__name, self.is_loaded)
+
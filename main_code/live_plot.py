@@ -0,0 +1,133 @@
+import numpy as np
+
+
+class BlitManager:
+
+    """
+        Keeps a bitmap of the static part of a figure (axes, labels, diagram background ...) and
+        only redraws the animated artists over it. The bitmap is captured again on every full draw
+        of the canvas (e.g. after a resize or a change of the axes limits).
+    """
+
+    def __init__(self, canvas, animated_artists=()):
+
+        self.canvas = canvas
+        self.background = None
+        self.artists = list()
+
+        for artist in animated_artists:
+            self.add_artist(artist)
+
+        self.cid = canvas.mpl_connect("draw_event", self.on_draw)
+
+    def add_artist(self, artist):
+
+        artist.set_animated(True)
+        self.artists.append(artist)
+
+    def on_draw(self, event):
+
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.__draw_animated()
+
+    def __draw_animated(self):
+
+        for artist in self.artists:
+            self.canvas.figure.draw_artist(artist)
+
+    def update(self):
+
+        if self.background is None:
+            self.canvas.draw()
+
+        else:
+            self.canvas.restore_region(self.background)
+            self.__draw_animated()
+            self.canvas.blit(self.canvas.figure.bbox)
+
+        self.canvas.flush_events()
+
+
+class LivePlot:
+
+    """
+        One persistent Line2D for each axis, updated with "set_data" and drawn with blitting.
+        The limits are changed (with some headroom, hence rarely) only when the data leave the
+        current ones or when they fill less than a quarter of them.
+
+        Several LivePlot on the same figure must share one "blit_manager" (a background of
+        the whole figure captured by another manager would cover their lines with stale
+        ones): update them with "set_data", then draw the figure once with the manager.
+    """
+
+    def __init__(self, fig, axs, autoscale=True, headroom=0.2, blit_manager=None, **line_kwargs):
+
+        self.fig = fig
+        self.axs = list(np.atleast_1d(axs))
+        self.autoscale = autoscale
+        self.headroom = headroom
+
+        self.lines = [ax.plot([], [], **line_kwargs)[0] for ax in self.axs]
+
+        if blit_manager is None:
+            blit_manager = BlitManager(fig.canvas)
+
+        for line in self.lines:
+            blit_manager.add_artist(line)
+
+        self.blit_manager = blit_manager
+
+    def update(self, x, ys):
+
+        if self.set_data(x, ys):
+            self.fig.canvas.draw()
+
+        self.blit_manager.update()
+
+    def set_data(self, x, ys) -> bool:
+
+        """Updates the lines without drawing them, returns True if the limits have changed."""
+
+        rescaled = False
+        for ax, line, y in zip(self.axs, self.lines, ys):
+
+            line.set_data(x, y)
+
+            if self.autoscale:
+                rescaled = self.__rescale(ax, x, y) or rescaled
+
+        return rescaled
+
+    def __rescale(self, ax, x, y) -> bool:
+
+        mask = np.isfinite(x) & np.isfinite(y)
+        if not np.any(mask):
+            return False
+
+        x_lim = self.__get_new_limits(ax.get_xlim(), x[mask])
+        y_lim = self.__get_new_limits(ax.get_ylim(), y[mask])
+
+        if x_lim is not None:
+            ax.set_xlim(x_lim)
+
+        if y_lim is not None:
+            ax.set_ylim(y_lim)
+
+        return x_lim is not None or y_lim is not None
+
+    def __get_new_limits(self, curr_limits, values):
+
+        v_min, v_max = np.min(values), np.max(values)
+        l_min, l_max = curr_limits
+
+        span = v_max - v_min
+        if span <= 0:
+            span = max(abs(v_max), 1.) * 0.1
+
+        inside = l_min <= v_min and v_max <= l_max
+        too_wide = (l_max - l_min) > 4 * span * (1 + 2 * self.headroom)
+
+        if inside and not too_wide:
+            return None
+
+        return v_min - self.headroom * span, v_max + self.headroom * span
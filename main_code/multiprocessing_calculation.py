@@ -1,14 +1,27 @@
-from main_code.dynamic_classes.dynamic_abstract_class import AbstractDynamicModelThermo as AbstractDynamicModel
-import multiprocessing.shared_memory as shm
-import matplotlib.patches as patches
-from multiprocessing import Manager
-import matplotlib.pyplot as plt
-from pynput import keyboard
+from main_code.dynamic_classes.dynamic_abstract_class import AbstractDynamicModelThermo as AbstractDynamicModel, keyboard
+from main_code.control_block import ControlBlock, ControlSnapshot, StatsBlock
+from main_code.profiling import StepProfiler, NoProfiler, StartupTimer
+from main_code.thermo_tools.diagram_cache import calculate_cached
+from main_code.segment_pool import SegmentPool, sweep_orphan_segments
+from main_code.headless_calculation import apply_schedule
+from main_code.history_pyramid import HistoryPyramid
+from main_code.input_schedule import InputRecorder
+from main_code.ring_buffer import SharedRingBuffer
+from main_code.scheduler import RealTimeScheduler
+from main_code.lazy_import import LazyModule
+from main_code.decimation import Decimator
+from main_code.recorder import record_results
+from main_code.live_plot import LivePlot
 import multiprocessing
 import numpy as np
 import time
 
 
+# Imported only by the plotting processes
+patches = LazyModule("matplotlib.patches")
+plt = LazyModule("matplotlib.pyplot")
+
+
 class CalculatorOptions:
 
     dtype = np.float64  # Data type
@@ -18,9 +31,35 @@ class CalculatorOptions:
     calculation_frequency = 1000    # Calculation frequency (Hz)
     plot_frequency = 30             # plot update frequency (Hz)
     buffer_size = 1000              # Buffer Size
+    buffer_frequency = None         # Buffer write frequency (Hz), None: a row for each calculation step
+    decimation_mode = "last"        # How steps are reduced to buffer rows: "last", "mean" or "minmax"
+
+    history_levels = 1              # Number of buffers of the history pyramid (1: only the main buffer)
+    history_factor = 10             # Decimation factor between two successive levels
+    history_mode = "minmax"         # Decimation mode of the levels above the main buffer
+    plot_time_span = None           # Time span shown in the plots (s), None: the whole main buffer
     thermo_buffer_size = 1000       # Thermo Buffer Size
+    thermo_buffer_frequency = None  # Thermo Buffer write frequency (Hz), None: the plot frequency
     draw_thermo_plot = False        # Activate the diagram plot drawing
 
+    catch_up_policy = "batch"       # What the worker does when late: "skip", "batch" or "degrade"
+    max_catch_up_steps = 10         # Maximum number of steps performed back to back to catch up
+    free_run = False                # Run the calculation as fast as possible (no real-time pacing)
+
+    record_file = None              # File in which the full history is recorded (None: no recording)
+    record_format = "memmap"        # "memmap" (raw binary + json header) or "hdf5" (requires h5py)
+    record_buffer_size = 100000     # Rows kept in memory waiting to be written
+    record_frequency = 2            # Recorder write frequency (Hz)
+    record_finish_timeout = 2.      # Final drain without the end of the worker after this time without new rows [s]
+
+    input_schedule = None           # {shared param: value or f(t)} applied before each step (overrides the keyboard)
+    input_record_file = None        # CSV in which the inputs of the run are saved (see replay_headless)
+
+    profile = False                 # Time the phases of each step and show the statistics on the dashboard
+    profile_samples = 1000          # Number of steps the statistics are evaluated on
+    profile_frequency = 2           # Statistics publishing frequency (Hz)
+    PROFILE_PHASES = ["control", "update", "export", "write", "step"]
+
     @property
     def dt(self):
         return self.time_factor / self.calculation_frequency
@@ -33,91 +72,241 @@ class CalculatorOptions:
     def t_sleep_max_plot(self):
         return 1 / self.plot_frequency
 
+    @property
+    def t_sleep_max_record(self):
+        return 1 / self.record_frequency
+
+    @property
+    def record(self):
+        return self.record_file is not None
+
+    @property
+    def t_sleep_max_profile(self):
+        return 1 / self.profile_frequency
+
+    def get_profiler(self):
+
+        if self.profile:
+            return StepProfiler(self.profile_samples)
+
+        return NoProfiler()
+
+    def get_input_recorder(self, model: AbstractDynamicModel):
+
+        if self.input_record_file is None:
+            return None
+
+        return InputRecorder(list(model.get_shared_params().keys()))
+
+    def get_profile_phases(self, model: AbstractDynamicModel):
+        return self.PROFILE_PHASES + list(model.profile_sections)
+
+    def get_scheduler(self):
+
+        return RealTimeScheduler(
+
+            0. if self.free_run else self.t_sleep_max,
+            catch_up=self.catch_up_policy,
+            max_batch=self.max_catch_up_steps
+
+        )
+
+    @property
+    def decimation_factor(self):
+
+        if self.buffer_frequency is None:
+            return 1
+
+        return max(1, int(round(self.calculation_frequency / self.buffer_frequency)))
+
+    def get_decimator(self):
+        return Decimator(self.decimation_factor, mode=self.decimation_mode)
+
+    @property
+    def thermo_decimation_factor(self):
+
+        # The diagram is redrawn at the plot frequency: more frequent points would not be seen
+        frequency = self.plot_frequency if self.thermo_buffer_frequency is None else self.thermo_buffer_frequency
+        return max(1, int(round(self.calculation_frequency / frequency)))
+
     def get_shape(self, model: AbstractDynamicModel):
 
-        n_elements = len(model.export_variables())
+        # Evaluated before "initialize": the exported variables must have class values. The
+        # (n_members, n_elements) blocks of the ensembles are written as a single row
+        n_elements = np.size(model.export_variables())
         return (self.buffer_size, n_elements)
 
     def get_thermo_shape(self, model: AbstractDynamicModel):
         n_elements = len(model.export_thermo_plot_variables())
         return (self.thermo_buffer_size, n_elements)
 
+    @staticmethod
+    def get_record_keys(model: AbstractDynamicModel):
+        return list(model.get_shared_params().keys()) + ["dt_%"]
+
+    def get_record_shape(self, model: AbstractDynamicModel):
+        n_elements = np.size(model.export_variables()) + len(self.get_record_keys(model))
+        return (self.record_buffer_size, n_elements)
+
 
-def worker(model: AbstractDynamicModel, options, shared_names, stop_flag, shared_params):
+def worker(model: AbstractDynamicModel, options, shared_names, stop_flag, shared_params, startup=None):
 
     """Worker function for each calculation step."""
-    model.initialize()
+    startup = StartupTimer() if startup is None else startup
+    startup.mark("imports")
 
-    buffer_head = 0
-    base_shape = options.get_shape(model)
-    existing_shm = shm.SharedMemory(name=shared_names[0])
-    buffer_arr = np.ndarray(base_shape, dtype=options.dtype, buffer=existing_shm.buf)
+    model.initialize_role("worker")
+    startup.mark("initialize")
+
+    # Attachments are closed at the end (the segments are unlinked by the launching process)
+    attachments = SegmentPool(owner=False)
+    attachments.register("control", stop_flag.block)
+
+    ring = attachments.register("main", SharedRingBuffer.attach(shared_names["main"], options.get_shape(model), dtype=options.dtype))
+    pyramid = attach_history(ring, shared_names, options, attachments)
+    pyramid_writer = pyramid.get_writer(mode=options.history_mode)
 
     if options.draw_thermo_plot:
-        thermo_buffer_head = 0
-        thermo_shape = options.get_thermo_shape(model)
-        thermo_shm = shm.SharedMemory(name=shared_names[1])
-        thermo_buff_arr = np.ndarray(thermo_shape, dtype=options.dtype, buffer=thermo_shm.buf)
+        thermo_ring = attachments.register("thermo", SharedRingBuffer.attach(shared_names["thermo"], options.get_thermo_shape(model), dtype=options.dtype))
 
-    print("Worker started!")
+    if options.record:
+        record_keys = options.get_record_keys(model)
+        record_ring = attachments.register("record", SharedRingBuffer.attach(shared_names["record"], options.get_record_shape(model), dtype=options.dtype))
 
-    mean_sleep_time = 0.
-    count = 0.
+    profiler = options.get_profiler()
+    if options.profile:
+        model.profiler = profiler
+        stats_block = attachments.register("stats", StatsBlock.attach(shared_names["stats"], shared_names["stats_fields"]))
+        next_publish = time.perf_counter()
+
+    print(startup.report("Worker"))
+
+    # Params are copied from the control block only when they change (no lock, no IPC)
+    control = ControlSnapshot(shared_params)
+
+    scheduler = options.get_scheduler()
+    decimator = options.get_decimator()
+    input_recorder = options.get_input_recorder(model)
+    n_thermo_steps = 0
     while not stop_flag.is_set():
 
-        if not shared_params["pause"].value:
+        params = control.update()
+        if params["pause"].value:
+
+            # Deadlines restart from the end of the pause (no catch up of the paused time)
+            scheduler.reset()
+            time.sleep(options.t_sleep_max_plot)
+            continue
+
+        # Sleep until the next deadline, more steps are requested if the worker is late
+        n_steps = scheduler.wait()
+
+        # Statistics are published for the dashboard at a much lower rate than the steps
+        if options.profile and time.perf_counter() > next_publish:
+            stats_block.publish(profiler.summary(), scheduler.stats.as_dict())
+            next_publish = time.perf_counter() + options.t_sleep_max_profile
+
+        for i in range(n_steps):
 
-            start_time = time.time()
+            profiler.start()
 
             # Perform your calculation step
-            dt = options.dt * shared_params["dt_%"].value
-            model.update(dt, shared_params)
+            params = control.update()
+            if options.input_schedule is not None:
+                apply_schedule(options.input_schedule, params, model.t)
 
-            # Update shared data (buffer)
-            exported_variables = model.export_variables()
-            buffer_arr[buffer_head, :] = exported_variables
-            buffer_head = np.mod(buffer_head + 1, options.buffer_size)
+            dt = options.dt * params["dt_%"].value
+            if input_recorder is not None:
+                input_recorder.record(model.t, dt, params)
 
-            # Update shared data for thermodynamic plot
+            profiler.lap("control")
+
+            model.update(dt, params)
+            profiler.lap("update")
+
+            # Update shared data (buffer), downsampled to the buffer frequency
+            exported_variables = model.export_variables().ravel()
+            profiler.lap("export")
+
+            decimated_rows = decimator.push(exported_variables)
+
+            if decimated_rows is not None:
+                pyramid_writer.write_rows(decimated_rows)
+
+            # Update shared data for the recorder (exported variables and inputs of the step)
+            if options.record:
+                record_ring.write(np.concatenate((
+
+                    exported_variables,
+                    [params[key].value for key in record_keys]
+
+                )))
+
+            # Update shared data for thermodynamic plot (downsampled to the thermo buffer frequency)
             if options.draw_thermo_plot:
-                thermo_buff_arr[thermo_buffer_head, :] = model.export_thermo_plot_variables()
-                thermo_buffer_head = np.mod(thermo_buffer_head + 1, options.thermo_buffer_size)
 
-            # Calculate the time taken for the current step
-            t_sleep_max = options.t_sleep_max
-            elapsed_time = time.time() - start_time
-            sleep_time = max(0., t_sleep_max - elapsed_time)  # Sleep to ensure dt time step
-            mean_sleep_time += sleep_time / t_sleep_max
-            count += 1
+                n_thermo_steps += 1
+                if n_thermo_steps >= options.thermo_decimation_factor:
+                    thermo_ring.write(model.export_thermo_plot_variables())
+                    n_thermo_steps = 0
 
-            time.sleep(sleep_time)  # Sleep for the remainder of the timestep
+            profiler.lap("write")
+            profiler.stop("step")
 
-    mean_sleep_time = mean_sleep_time / count
-    occupation = 1 - mean_sleep_time
+    stats = scheduler.stats
     print(
 
-        "Worker finished! (mean sleep time {:.2f}ms, cycle occupation: {:.2f}%, iterations: {})".format(
-            mean_sleep_time * options.t_sleep_max * 1000,
-            occupation * 100,
-            count
+        "Worker finished! (cycle occupation: {:.2f}%, iterations: {}, late: {}, missed: {}, "
+        "max lateness {:.2f}ms, mean jitter {:.3f}ms)".format(
+            stats.occupation * 100,
+            stats.n_steps,
+            stats.n_late,
+            stats.n_missed,
+            stats.max_lateness * 1000,
+            stats.mean_jitter * 1000
 
         )
 
     )
 
-def plot_results(model: AbstractDynamicModel, options, shared_names, stop_flag):
+    if options.profile:
+        stats_block.publish(profiler.summary(), stats.as_dict())
+        print(profiler.report())
+
+    if input_recorder is not None:
+        input_recorder.save(options.input_record_file)
+        print("Inputs of {} steps saved in '{}'".format(input_recorder.n_steps, options.input_record_file))
+
+    # The recorder drains the ring for the last time only after this
+    if options.record:
+        record_ring.finish()
+
+    attachments.release_all()
+
+def attach_history(ring: SharedRingBuffer, shared_names, options, attachments: SegmentPool) -> HistoryPyramid:
 
-    model.initialize()
+    pyramid = HistoryPyramid.attach(ring, shared_names["history"], factor=options.history_factor)
+    for level, level_ring in enumerate(pyramid.rings[1:], 1):
+        attachments.register("history/{}".format(level), level_ring)
+
+    return pyramid
+
+def plot_results(model: AbstractDynamicModel, options, shared_names, stop_flag, startup=None):
 
     """Real-time plotting of results."""
+    startup = StartupTimer() if startup is None else startup
+    startup.mark("imports")
+
+    model.initialize_role("plot")
+    startup.mark("initialize")
+
     x_label = model.x_label
     y_labels = model.y_labels
     n_rows = len(y_labels)
 
     plt.ion()  # Turn on interactive mode
     fig, axs = plt.subplots(nrows=n_rows)
-
-    plt.tight_layout()
+    axs = np.atleast_1d(axs)
 
     for n, ax in enumerate(axs):
         ax.set_xlabel(x_label)
@@ -125,32 +314,30 @@ def plot_results(model: AbstractDynamicModel, options, shared_names, stop_flag):
 
     plt.tight_layout()
 
-    existing_shm = shm.SharedMemory(name=shared_names[0])
-    n_elements = len(model.export_variables())
-    shape = (options.buffer_size, n_elements)
-    buffer_arr = np.ndarray(shape, dtype=options.dtype, buffer=existing_shm.buf)
+    # Labels and axes are drawn once, then only the lines are updated
+    live_plot = LivePlot(fig, axs)
+    plt.show(block=False)
+    fig.canvas.draw()
+
+    attachments = SegmentPool(owner=False)
+    attachments.register("control", stop_flag.block)
+
+    ring = attachments.register("main", SharedRingBuffer.attach(shared_names["main"], options.get_shape(model), dtype=options.dtype))
+    pyramid = attach_history(ring, shared_names, options, attachments)
     mean_sleep_time = 0.
     count = 0.
 
-    print("Plot started!")
+    startup.mark("figure")
+    print(startup.report("Plot"))
 
     while not stop_flag.is_set():
 
         start_time = time.time()
-        curr_buffer = buffer_arr.copy()
-        sorted_indices = np.argsort(np.nan_to_num(curr_buffer[:, 0], nan=np.inf))
-        sorted_buffer = curr_buffer[sorted_indices]
 
-        for n, ax in enumerate(axs):
-            ax.clear()
-            ax.plot(sorted_buffer[:, 0], sorted_buffer[:, n+1])
+        # The level of the history is chosen to match the time span shown
+        sorted_buffer = pyramid.read_span(options.plot_time_span)
 
-            ax.set_xlabel(x_label)
-            ax.set_ylabel(y_labels[n])
-
-        fig.canvas.draw_idle()
-
-        plt.pause(0.01)  # Small pause to allow updates
+        live_plot.update(sorted_buffer[:, 0], [sorted_buffer[:, n + 1] for n in range(n_rows)])
 
         t_sleep_max = options.t_sleep_max_plot
         elapsed_time = time.time() - start_time
@@ -162,7 +349,10 @@ def plot_results(model: AbstractDynamicModel, options, shared_names, stop_flag):
         time.sleep(sleep_time)
 
     plt.ioff()
-    mean_sleep_time = mean_sleep_time / count
+    plt.close(fig)
+    attachments.release_all()
+
+    mean_sleep_time = mean_sleep_time / max(count, 1)   # stopped before the first frame in short runs
     occupation = 1 - mean_sleep_time
     print(
 
@@ -175,10 +365,16 @@ def plot_results(model: AbstractDynamicModel, options, shared_names, stop_flag):
 
     )
 
-def plot_dashboard(shared_params, stop_flag, options):
+def plot_dashboard(shared_params, stop_flag, options, shared_names=None, startup=None):
+
+    startup = StartupTimer() if startup is None else startup
+    startup.mark("imports")
+
+    attachments = SegmentPool(owner=False)
+    attachments.register("control", stop_flag.block)
 
     plt.ion()
-    fig = plt.figure(figsize=(3, 2))
+    fig = plt.figure(figsize=(6, 5) if options.profile else (3, 2))
 
     dashboard_ax = fig.add_axes([0.1, 0.1, 0.8, 0.8])
     dashboard_ax.axis('off')
@@ -204,6 +400,14 @@ def plot_dashboard(shared_params, stop_flag, options):
     # Text indicator for inflow percentage (dt_%)
     inflow_text = dashboard_ax.text(0.5, 0.45, "Time Scale: 50%", ha='center', fontsize=10)
 
+    # Step profiling table (published by the worker)
+    if options.profile:
+        stats_block = attachments.register("stats", StatsBlock.attach(shared_names["stats"], shared_names["stats_fields"]))
+        stats_text = dashboard_ax.text(0., 0.38, "", va='top', family='monospace', fontsize=8)
+
+    startup.mark("figure")
+    print(startup.report("Dashboard"))
+
     while not stop_flag.is_set():
 
         start_time = time.time()
@@ -219,6 +423,9 @@ def plot_dashboard(shared_params, stop_flag, options):
         circles["Running"].set_color('green' if not paused else 'gray')
         circles["Paused"].set_color('red' if paused else 'gray')
 
+        if options.profile:
+            stats_text.set_text(format_statistics(*stats_block.get_statistics(), options.t_sleep_max))
+
         # Update the figure
         fig.canvas.draw()
 
@@ -230,36 +437,68 @@ def plot_dashboard(shared_params, stop_flag, options):
         time.sleep(sleep_time)
 
     plt.ioff()
+    plt.close(fig)
+    attachments.release_all()
+
+def format_statistics(statistics: dict, deadline: dict, budget) -> str:
+
+    lines = ["{:<14}{:>8}{:>8}{:>8}{:>8}".format("[ms]", "p50", "p95", "p99", "max")]
+    for phase, values in statistics.items():
+
+        lines.append("{:<14}{:>8.3f}{:>8.3f}{:>8.3f}{:>8.3f}".format(
+
+            phase, *[values[key] * 1000 for key in ["p50", "p95", "p99", "max"]]
+
+        ))
+
+    lines.append("")
+    lines.append("budget {:.3f}ms, occupation {:.1f}%".format(budget * 1000, deadline["occupation"] * 100))
+    lines.append("late {:.0f}, missed {:.0f} of {:.0f} steps".format(
+
+        deadline["n_late"], deadline["n_missed"], deadline["n_steps"]
 
-def plot_thermo_plot(model: AbstractDynamicModel, options, shared_names, stop_flag):
+    ))
+    return "\n".join(lines)
 
-    model.initialize()
+def plot_thermo_plot(model: AbstractDynamicModel, options, shared_names, stop_flag, startup=None):
+
+    startup = StartupTimer() if startup is None else startup
+    startup.mark("imports")
+
+    # The shape is evaluated as in "run_simulation" (before any initialization)
+    attachments = SegmentPool(owner=False)
+    attachments.register("control", stop_flag.block)
+    ring = attachments.register("thermo", SharedRingBuffer.attach(shared_names["thermo"], options.get_thermo_shape(model), dtype=options.dtype))
+
+    # Only the points needed by the diagram are created
+    model.initialize_role("thermo_plot")
+    startup.mark("initialize")
 
     plt.ion()
     fig, ax = plt.subplots(nrows=1, ncols=1, figsize=(7, 5))
 
-    existing_shm = shm.SharedMemory(name=shared_names[1])
-    shape = options.get_thermo_shape(model)
-    buffer_arr = np.ndarray(shape, dtype=options.dtype, buffer=existing_shm.buf)
-
+    # Loaded from the disk cache after the first run
     plotter = model.init_diagram_plotter()
-    plotter.calculate()
+    calculate_cached(plotter)
+    startup.mark("diagram")
+
+    # The diagram is drawn once and kept as background bitmap, only the trajectory is redrawn
+    plotter.plot(ax)
+    live_plot = LivePlot(fig, ax, autoscale=False)
+    plt.show(block=False)
+    fig.canvas.draw()
+
+    startup.mark("figure")
+    print(startup.report("Thermo Plot"))
 
     count = 0
     mean_sleep_time = 0.
     while not stop_flag.is_set():
 
         start_time = time.time()
-        ax.clear()
-
-        curr_buffer = buffer_arr.copy()
-        sorted_indices = np.argsort(np.nan_to_num(curr_buffer[:, 0], nan=np.inf))
-        sorted_buffer = curr_buffer[sorted_indices]
+        sorted_buffer = ring.read()
 
-        plotter.plot(ax)
-        ax.plot(sorted_buffer[:, 0], sorted_buffer[:, 1])
-        fig.canvas.draw_idle()
-        plt.pause(0.01)  # Small pause to allow updates
+        live_plot.update(sorted_buffer[:, 0], [sorted_buffer[:, 1]])
 
         t_sleep_max = options.t_sleep_max_plot
         elapsed_time = time.time() - start_time
@@ -271,8 +510,10 @@ def plot_thermo_plot(model: AbstractDynamicModel, options, shared_names, stop_fl
         time.sleep(sleep_time)
 
     plt.ioff()
+    plt.close(fig)
+    attachments.release_all()
 
-    mean_sleep_time = mean_sleep_time / count
+    mean_sleep_time = mean_sleep_time / max(count, 1)   # stopped before the first frame in short runs
     occupation = 1 - mean_sleep_time
     print(
 
@@ -289,65 +530,123 @@ def keyboard_listener(model, stop_flag, shared_parms):
 
     print("Listener started!")
 
+    # Also returns if the simulation is stopped by a crashed process
     with keyboard.Listener(on_press=lambda key: model.on_key_pressed(key, stop_flag, shared_parms)) as listener:
-        listener.join()
+        while listener.running and not stop_flag.is_set():
+            listener.join(0.1)
 
     print("Listener finished!")
 
-def run_simulation(model: AbstractDynamicModel, options: CalculatorOptions):
+def allocate_shared_memory(model: AbstractDynamicModel, options: CalculatorOptions, pool: SegmentPool):
 
-    manager = Manager()
-    stop_flag = manager.Event()
+    """Segments needed by a run (taken from "pool"), returns (control block, memory names)."""
 
-    shared_params = {
+    # Stop flag, time scale, pause and model params in a single shared-memory record
+    control_block = pool.get_block("control", ControlBlock.get_fields(model.get_shared_params()))
 
-        "dt_%": multiprocessing.Value('d', 1.),
-        "pause": multiprocessing.Value("b", False)
+    # Allocate and Initialize shared memory (Main Data Buffer)
+    ring = pool.get_ring("main", options.get_shape(model), dtype=options.dtype)
+    memory_names = {"main": ring.name}
 
-    }
-    main_shared_param = model.get_shared_params()
-    for key in main_shared_param:
-        shared_params.update({key: multiprocessing.Value('d', main_shared_param[key])})
+    # Allocate and Initialize shared memory (Decimated History Buffers)
+    memory_names.update({"history": [
 
-    # Allocate and Initialize shared memory (Main Data Buffer)
-    shape = options.get_shape(model)
-    memory_size = int(np.prod(shape) * np.dtype(options.dtype).itemsize)
-    shared_mem = shm.SharedMemory(create=True, size=memory_size)
-    shared_buffer = np.ndarray(shape, dtype=options.dtype, buffer=shared_mem.buf)
-    shared_buffer[:] = np.nan
-    memory_names = [shared_mem.name]
+        pool.get_ring("history/{}".format(level), options.get_shape(model), dtype=options.dtype).name
+        for level in range(1, options.history_levels)
+
+    ]})
 
     # Allocate and Initialize shared memory (Thermodynamic Plot Data Buffer)
     if options.draw_thermo_plot:
-        thermo_shape = options.get_thermo_shape(model)
-        memory_size = int(np.prod(thermo_shape) * np.dtype(options.dtype).itemsize)
-        thermo_mem = shm.SharedMemory(create=True, size=memory_size)
-        thermo_buffer = np.ndarray(thermo_shape, dtype=options.dtype, buffer=thermo_mem.buf)
-        thermo_buffer[:] = np.nan
-        memory_names.append(thermo_mem.name)
+        thermo_ring = pool.get_ring("thermo", options.get_thermo_shape(model), dtype=options.dtype)
+        memory_names.update({"thermo": thermo_ring.name})
 
-    # Start the calculation process
-    calc_process = multiprocessing.Process(target=worker, args=(model, options, memory_names, stop_flag, shared_params))
-    calc_process.start()
+    # Allocate and Initialize shared memory (Profiling Statistics)
+    if options.profile:
+        stats_fields = StatsBlock.get_stats_fields(options.get_profile_phases(model))
+        stats_block = pool.get_block("stats", stats_fields, block_class=StatsBlock)
+        memory_names.update({"stats": stats_block.name, "stats_fields": stats_block.fields})
 
-    dashboard_process = multiprocessing.Process(target=plot_dashboard, args=(shared_params, stop_flag, options))
-    dashboard_process.start()
+    # Allocate and Initialize shared memory (Recorder Buffer)
+    if options.record:
+        record_ring = pool.get_ring("record", options.get_record_shape(model), dtype=options.dtype)
+        memory_names.update({"record": record_ring.name})
 
-    # Start the plotting process
-    plot_process = multiprocessing.Process(target=plot_results, args=(model, options, memory_names, stop_flag))
-    plot_process.start()
+    return control_block, memory_names
 
-    if options.draw_thermo_plot:
-        thermo_plot_process = multiprocessing.Process(target=plot_thermo_plot, args=(model, options, memory_names, stop_flag))
-        thermo_plot_process.start()
+def run_process(target, args, stop_flag):
+
+    """Process entry point: an error stops the whole simulation instead of leaving the others running."""
+
+    try:
+        target(*args)
+
+    except BaseException:
+        stop_flag.set()
+        raise
+
+def stop_processes(processes: list, stop_flag, timeout=5.):
+
+    stop_flag.set()
+    for process in processes:
+
+        process.join(timeout)
+        if process.is_alive():
+            print("{} did not stop, terminating it".format(process.name))
+            process.terminate()
+            process.join()
+
+def get_process_targets(model: AbstractDynamicModel, options: CalculatorOptions, memory_names, control_block, startup) -> list:
+
+    """(target, args) of the processes of a run, the keyboard listener excluded."""
+
+    stop_flag = control_block.stop_flag
+    shared_params = control_block.get_params()
 
-    # Start keyboard input monitoring process
-    keyboard_listener(model, stop_flag, shared_params)
+    targets = [
 
-    # Wait for the workers to finish
-    calc_process.join()
-    plot_process.join()
-    dashboard_process.join()
+        (worker, (model, options, memory_names, stop_flag, shared_params, startup)),
+        (plot_dashboard, (shared_params, stop_flag, options, memory_names, startup)),
+        (plot_results, (model, options, memory_names, stop_flag, startup))
+
+    ]
 
     if options.draw_thermo_plot:
-        thermo_plot_process.join()
+        targets.append((plot_thermo_plot, (model, options, memory_names, stop_flag, startup)))
+
+    if options.record:
+        targets.append((record_results, (model, options, memory_names, stop_flag, startup)))
+
+    return [(run_process, (target, args, stop_flag)) for target, args in targets]
+
+def run_simulation(model: AbstractDynamicModel, options: CalculatorOptions):
+
+    # Segments left by runs that could not tear down (killed processes) are removed first
+    sweep_orphan_segments()
+
+    # The segments are closed and unlinked when leaving the block, also after an error
+    with SegmentPool() as pool:
+
+        control_block, memory_names = allocate_shared_memory(model, options, pool)
+        print(pool.report())
+
+        # Each process reports the time from here to the start of its loop
+        startup = StartupTimer()
+        processes = list()
+
+        try:
+
+            # Start the calculation, dashboard, plotting (and thermo plot and recording) processes
+            for target, args in get_process_targets(model, options, memory_names, control_block, startup):
+
+                processes.append(multiprocessing.Process(target=target, args=args))
+                processes[-1].start()
+
+            # Start keyboard input monitoring process
+            keyboard_listener(model, control_block.stop_flag, control_block.get_params())
+
+        finally:
+
+            # ESC, a crashed process or an error here (e.g. Ctrl+C): every process is stopped
+            # before the segments are unlinked
+            stop_processes(processes, control_block.stop_flag)
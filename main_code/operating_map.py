@@ -0,0 +1,154 @@
+from main_code.thermo_tools.cache_utils import get_cache_path
+from main_code.thermo_tools.backend import THERMO_BACKEND
+from multiprocessing import Pool
+import numpy as np
+import hashlib
+import inspect
+import os
+
+
+class OperatingMap:
+
+    """
+        Steady states of a model ("get_steady_state") over a grid of inputs, one axis for
+        "m_in_perc" and one for "yd_perc": self.values["T"][i, j] is the steady temperature
+        for m_in_values[i] and yd_values[j]. Points without a steady state are NaN, their
+        regime (see BoilerDynamicModel.STEADY_STATE_REGIMES) is in self.regimes.
+    """
+
+    variables = ["T", "P", "m_dot_out", "V_x", "m_in", "h_in"]
+
+    def __init__(self, model_class, m_in_values, yd_values, class_values=None):
+
+        if class_values is None:
+            class_values = dict()
+
+        self.model_class = model_class
+        self.class_values = dict(class_values)
+        self.m_in_values = np.asarray(m_in_values, dtype=float)
+        self.yd_values = np.asarray(yd_values, dtype=float)
+
+        self.values = None
+        self.regimes = None
+
+    @property
+    def key(self) -> tuple:
+
+        # The class attributes and the source code are part of the key, so that editing the
+        # model (values or methods) invalidates the map
+        return (
+
+            THERMO_BACKEND, self.model_class.__module__, self.model_class.__name__,
+            get_model_attributes(self.model_class, self.class_values),
+            get_source_hash(self.model_class),
+            tuple(self.m_in_values), tuple(self.yd_values)
+
+        )
+
+    @property
+    def shape(self) -> tuple:
+        return len(self.m_in_values), len(self.yd_values)
+
+    @property
+    def is_ready(self) -> bool:
+        return self.values is not None
+
+    def build(self, n_processes=None):
+
+        tasks = [(self.model_class, self.class_values, m_in_perc, self.yd_values) for m_in_perc in self.m_in_values]
+
+        with Pool(processes=n_processes) as pool:
+            rows = pool.map(steady_state_task, tasks)
+
+        self.values = {key: np.array([[point[key] for point in row] for row in rows]) for key in self.variables}
+        self.regimes = np.array([[point["regime"] for point in row] for row in rows])
+
+    def save(self, file_path):
+        np.savez_compressed(file_path, regimes=self.regimes, **self.values)
+
+    def load(self, file_path):
+
+        with np.load(file_path) as data:
+            self.values = {key: data[key] for key in self.variables}
+            self.regimes = data["regimes"]
+
+    def get_point(self, m_in_perc, yd_perc) -> dict:
+
+        """Steady state of the grid point closest to the given inputs."""
+
+        i = int(np.argmin(np.abs(self.m_in_values - m_in_perc)))
+        j = int(np.argmin(np.abs(self.yd_values - yd_perc)))
+
+        point = {key: self.values[key][i, j] for key in self.variables}
+        point.update({"m_in_perc": self.m_in_values[i], "yd_perc": self.yd_values[j], "regime": str(self.regimes[i, j])})
+        return point
+
+
+def get_model_attributes(model_class, class_values) -> tuple:
+
+    attributes = dict()
+    for name in dir(model_class):
+
+        value = getattr(model_class, name)
+        if not name.startswith("_") and isinstance(value, (bool, int, float, str, tuple)):
+            attributes[name] = value
+
+    attributes.update(class_values)
+    return tuple(sorted(attributes.items()))
+
+
+def get_source_hash(model_class) -> str:
+
+    """Hash of the source of the model class and of its base classes."""
+
+    sources = list()
+    for cls in model_class.__mro__:
+
+        try:
+            sources.append(inspect.getsource(cls))
+
+        except (OSError, TypeError):
+            # Built-in classes (object) or classes without a source file
+            sources.append(cls.__qualname__)
+
+    return hashlib.md5("\n".join(sources).encode("utf-8")).hexdigest()
+
+
+def steady_state_task(args):
+
+    # One row of the map per task: the model (and its ThermodynamicPoint instances) is
+    # created and initialized once in the pool worker and reused for all the yd values
+    model_class, class_values, m_in_perc, yd_values = args
+
+    model = model_class()
+    for key, value in class_values.items():
+        setattr(model, key, value)
+
+    return [model.get_steady_state(m_in_perc, yd_perc) for yd_perc in yd_values]
+
+
+def build_operating_map(
+
+        model_class, m_in_values, yd_values, class_values=None,
+        n_processes=None, cache_dir=None, use_cache=True
+
+) -> OperatingMap:
+
+    """
+        Steady states of "model_class" for every combination of "m_in_values" and "yd_values"
+        (in %), the rows being spread over a process pool. The map is stored in the cache
+        folder (see main_code.thermo_tools.cache_utils) and loaded by the following calls
+        with the same model, attributes ("class_values" included) and grid.
+    """
+
+    operating_map = OperatingMap(model_class, m_in_values, yd_values, class_values=class_values)
+    file_path = get_cache_path("operating_map", operating_map.key, cache_dir=cache_dir)
+
+    if use_cache and os.path.isfile(file_path):
+        operating_map.load(file_path)
+
+    else:
+        operating_map.build(n_processes=n_processes)
+        operating_map.save(file_path)
+
+    return operating_map
@@ -0,0 +1,122 @@
+from main_code.headless_calculation import run_headless
+from multiprocessing import Pool
+import numpy as np
+import itertools
+
+
+class SweepResults:
+
+    def __init__(self, values: np.ndarray, combinations: list, class_params: dict, shared_params: dict):
+
+        self.values = values                    # shape: (n_combinations, n_steps, n_elements)
+        self.combinations = combinations        # list of (class values, shared values) dictionaries
+        self.class_params = class_params
+        self.shared_params = shared_params
+
+    @property
+    def grid_shape(self) -> tuple:
+
+        lengths = [len(values) for values in self.class_params.values()]
+        lengths.extend([len(values) for values in self.shared_params.values()])
+        return tuple(lengths)
+
+    def reshaped(self) -> np.ndarray:
+
+        """Results with one axis for every swept parameter (class params first, then shared params)."""
+        return self.values.reshape(self.grid_shape + self.values.shape[1:])
+
+    def index_of(self, **params) -> int:
+
+        for i, (class_values, shared_values) in enumerate(self.combinations):
+
+            curr_values = dict(class_values)
+            curr_values.update(shared_values)
+
+            if all(curr_values[key] == value for key, value in params.items()):
+                return i
+
+        raise KeyError("No combination matches {}".format(params))
+
+
+def build_sweep_grid(class_params=None, shared_params=None) -> list:
+
+    if class_params is None:
+        class_params = dict()
+
+    if shared_params is None:
+        shared_params = dict()
+
+    class_keys = list(class_params.keys())
+    shared_keys = list(shared_params.keys())
+    all_values = [class_params[key] for key in class_keys] + [shared_params[key] for key in shared_keys]
+
+    combinations = list()
+    for values in itertools.product(*all_values):
+
+        class_values = dict(zip(class_keys, values[:len(class_keys)]))
+        shared_values = dict(zip(shared_keys, values[len(class_keys):]))
+        combinations.append((class_values, shared_values))
+
+    return combinations
+
+
+def sweep_task(args):
+
+    # Executed in the pool workers: the model (and hence its ThermodynamicPoint
+    # instances) is created here so that each process owns its own REFPROP handlers
+    model_class, class_values, shared_values, dt, horizon, schedule, stop_on_error = args
+
+    model = model_class()
+    for key, value in class_values.items():
+        setattr(model, key, value)
+
+    return run_headless(
+
+        model, dt, horizon, schedule=schedule,
+        initial_values=shared_values,
+        stop_on_error=stop_on_error
+
+    )
+
+
+def run_sweep(
+
+        model_class, dt, horizon, class_params=None, shared_params=None,
+        schedule=None, n_processes=None, stop_on_error=True
+
+) -> SweepResults:
+
+    """
+        Run "model_class" headless for every combination of the values listed in "class_params"
+        (model attributes, e.g. {"V_in": [0.01, 0.02]}) and "shared_params" (initial shared param
+        values, e.g. {"yd_perc": [1, 10, 100]}), spreading the runs over a process pool.
+
+        Runs stopped early by an error are padded with NaN so that all the results can be stacked.
+    """
+
+    if class_params is None:
+        class_params = dict()
+
+    if shared_params is None:
+        shared_params = dict()
+
+    combinations = build_sweep_grid(class_params, shared_params)
+    tasks = [
+
+        (model_class, class_values, shared_values, dt, horizon, schedule, stop_on_error)
+        for class_values, shared_values in combinations
+
+    ]
+
+    with Pool(processes=n_processes) as pool:
+        results = pool.map(sweep_task, tasks)
+
+    n_steps = int(np.ceil(horizon / dt - 1e-9))
+    n_elements = max([result.shape[1] for result in results if result.ndim == 2] + [0])
+    values = np.full((len(results), n_steps, n_elements), np.nan)
+
+    for i, result in enumerate(results):
+        if len(result) > 0:
+            values[i, :len(result), :] = result
+
+    return SweepResults(values, combinations, class_params, shared_params)
@@ -0,0 +1,181 @@
+import numpy as np
+import time
+
+
+class StepProfiler:
+
+    """
+        Keeps the last "n_samples" durations of each named phase of the calculation loop.
+        Phases are measured either as laps ("start" then "lap" at the end of each phase) or
+        as sections ("with profiler.section(name):"), which models can use for their own code.
+    """
+
+    PERCENTILES = [50, 95, 99]
+    STATISTICS = ["mean", "p50", "p95", "p99", "max", "n_calls"]
+
+    def __init__(self, n_samples=1000):
+
+        self.n_samples = int(n_samples)
+        self.samples = dict()
+        self.n_calls = dict()
+        self.start_time = None
+        self.last_time = None
+
+    def add(self, name, duration):
+
+        if name not in self.samples:
+            self.samples[name] = np.full(self.n_samples, np.nan)
+            self.n_calls[name] = 0
+
+        self.samples[name][self.n_calls[name] % self.n_samples] = duration
+        self.n_calls[name] += 1
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self.last_time = self.start_time
+
+    def lap(self, name):
+
+        now = time.perf_counter()
+        self.add(name, now - self.last_time)
+        self.last_time = now
+
+    def stop(self, name="step"):
+
+        """Total time since "start"."""
+
+        self.add(name, time.perf_counter() - self.start_time)
+
+    def section(self, name):
+        return ProfilerSection(self, name)
+
+    def get_statistics(self, name) -> dict:
+
+        """Statistics of the last samples of a phase (durations in seconds)."""
+
+        if name not in self.samples:
+            return {key: 0. for key in self.STATISTICS}
+
+        samples = self.samples[name][:min(self.n_calls[name], self.n_samples)]
+        percentiles = np.percentile(samples, self.PERCENTILES)
+
+        statistics = {"mean": float(np.mean(samples))}
+        statistics.update({"p{}".format(q): float(p) for q, p in zip(self.PERCENTILES, percentiles)})
+        statistics.update({"max": float(np.max(samples)), "n_calls": float(self.n_calls[name])})
+        return statistics
+
+    def summary(self) -> dict:
+        return {name: self.get_statistics(name) for name in self.samples.keys()}
+
+    def report(self) -> str:
+
+        lines = ["{:<24}{:>10}{:>10}{:>10}{:>10}{:>10}".format("phase [ms]", "mean", "p50", "p95", "p99", "max")]
+        for name, statistics in self.summary().items():
+
+            lines.append("{:<24}{:>10.3f}{:>10.3f}{:>10.3f}{:>10.3f}{:>10.3f}".format(
+
+                name, *[statistics[key] * 1000 for key in self.STATISTICS[:-1]]
+
+            ))
+
+        return "\n".join(lines)
+
+
+class ProfilerSection:
+
+    def __init__(self, profiler: StepProfiler, name):
+
+        self.profiler = profiler
+        self.name = name
+        self.start_time = 0.
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.add(self.name, time.perf_counter() - self.start_time)
+        return False
+
+
+class NoProfiler:
+
+    """Same interface of StepProfiler doing nothing (used when profiling is off)."""
+
+    def add(self, name, duration):
+        pass
+
+    def start(self):
+        pass
+
+    def lap(self, name):
+        pass
+
+    def stop(self, name="step"):
+        pass
+
+    def section(self, name):
+        return NO_PROFILER_SECTION
+
+    def summary(self) -> dict:
+        return dict()
+
+
+class NoProfilerSection:
+
+    """Used by the models when no profiler is attached (no timing at all)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NO_PROFILER_SECTION = NoProfilerSection()
+
+
+class StartupTimer:
+
+    """
+        Startup phases of a process of the simulation. The timer is created by the launching
+        process (just before "Process.start") and passed to the child, which marks the end of
+        each of its phases:
+
+            startup.mark("imports")         # first line of the process target
+            model.initialize_role("plot")
+            startup.mark("initialize")
+
+        The first phase includes the interpreter start and the imports triggered by unpickling
+        the arguments (time.time is used as it is shared by all the processes).
+    """
+
+    def __init__(self):
+        self.launch_time = time.time()
+        self.marks = list()
+
+    def mark(self, name):
+        self.marks.append((name, time.time()))
+
+    @property
+    def total_time(self) -> float:
+
+        if len(self.marks) == 0:
+            return 0.
+
+        return self.marks[-1][1] - self.launch_time
+
+    def get_phases(self) -> dict:
+
+        phases = dict()
+        last_time = self.launch_time
+        for name, mark_time in self.marks:
+            phases[name] = mark_time - last_time
+            last_time = mark_time
+
+        return phases
+
+    def report(self, role) -> str:
+
+        phases = ", ".join("{} {:.0f}ms".format(name, value * 1000) for name, value in self.get_phases().items())
+        return "{} ready in {:.0f}ms ({})".format(role, self.total_time * 1000, phases)
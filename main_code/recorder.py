@@ -0,0 +1,200 @@
+from main_code.segment_pool import SegmentPool
+from main_code.ring_buffer import SharedRingBuffer
+from main_code.profiling import StartupTimer
+from abc import ABC, abstractmethod
+import numpy as np
+import json
+import time
+import os
+
+
+class AbstractRecorderStore(ABC):
+
+    def __init__(self, file_path, columns: list, dtype=np.float64):
+
+        self.file_path = file_path
+        self.columns = list(columns)
+        self.dtype = np.dtype(dtype)
+        self.n_rows = 0
+
+    @abstractmethod
+    def append(self, rows: np.ndarray):
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
+
+
+class MemmapRecorderStore(AbstractRecorderStore):
+
+    """
+        Rows are appended as raw binary data to "file_path" (readable as a np.memmap) while the
+        column names and the data type are stored in the "file_path.json" header.
+    """
+
+    def __init__(self, file_path, columns: list, dtype=np.float64):
+
+        super().__init__(file_path, columns, dtype)
+
+        self.__file = open(file_path, "wb")
+        self.__write_header()
+
+    def __write_header(self):
+
+        with open(self.file_path + ".json", "w") as header_file:
+            json.dump({"columns": self.columns, "dtype": self.dtype.str, "n_rows": self.n_rows}, header_file)
+
+    def append(self, rows: np.ndarray):
+
+        self.__file.write(np.ascontiguousarray(rows, dtype=self.dtype).tobytes())
+        self.n_rows += len(rows)
+
+    def close(self):
+
+        self.__file.close()
+        self.__write_header()
+
+    @staticmethod
+    def load(file_path):
+
+        with open(file_path + ".json", "r") as header_file:
+            header = json.load(header_file)
+
+        n_columns = len(header["columns"])
+        if os.path.getsize(file_path) == 0:
+            return np.empty((0, n_columns), dtype=header["dtype"]), header["columns"]
+
+        data = np.memmap(file_path, dtype=header["dtype"], mode="r")
+        n_rows = len(data) // n_columns
+        return data[:n_rows * n_columns].reshape(n_rows, n_columns), header["columns"]
+
+
+class HDF5RecorderStore(AbstractRecorderStore):
+
+    """Rows are appended to a chunked and resizable "recording" dataset (requires h5py)."""
+
+    def __init__(self, file_path, columns: list, dtype=np.float64, chunk_rows=4096):
+
+        super().__init__(file_path, columns, dtype)
+
+        import h5py
+
+        self.__file = h5py.File(file_path, "w")
+        self.__dataset = self.__file.create_dataset(
+
+            "recording", shape=(0, len(columns)), maxshape=(None, len(columns)),
+            dtype=self.dtype, chunks=(chunk_rows, len(columns)), compression="gzip"
+
+        )
+        self.__dataset.attrs["columns"] = self.columns
+
+    def append(self, rows: np.ndarray):
+
+        self.__dataset.resize(self.n_rows + len(rows), axis=0)
+        self.__dataset[self.n_rows:, :] = rows
+        self.n_rows += len(rows)
+
+    def close(self):
+        self.__file.close()
+
+    @staticmethod
+    def load(file_path):
+
+        import h5py
+
+        with h5py.File(file_path, "r") as h5_file:
+            dataset = h5_file["recording"]
+            return dataset[:], [str(column) for column in dataset.attrs["columns"]]
+
+
+RECORDER_STORES = {
+
+    "memmap": MemmapRecorderStore,
+    "hdf5": HDF5RecorderStore
+
+}
+
+
+def load_recording(file_path, record_format="memmap"):
+
+    """Returns (data, columns) of a recording written by "record_results"."""
+
+    return RECORDER_STORES[record_format].load(file_path)
+
+
+def get_record_columns(model, record_keys: list) -> list:
+
+    n_elements = np.size(model.export_variables())
+    labels = [model.x_label] + list(model.y_labels)
+
+    if not len(labels) == n_elements:
+        labels = ["var_{}".format(i) for i in range(n_elements)]
+
+    return labels + list(record_keys)
+
+
+def record_results(model, options, shared_names, stop_flag, startup=None):
+
+    """
+        Recorder process: drains the record ring written by the worker (exported variables and
+        shared params of every step) and appends the new rows to the store in batches, so that
+        the calculation never waits for the disk.
+    """
+
+    startup = StartupTimer() if startup is None else startup
+    startup.mark("imports")
+
+    model.initialize_role("recorder")
+    startup.mark("initialize")
+
+    # Attachments are closed at the end (the segments are unlinked by the launching process)
+    attachments = SegmentPool(owner=False)
+    attachments.register("control", stop_flag.block)
+    ring = attachments.register("record", SharedRingBuffer.attach(shared_names["record"], options.get_record_shape(model), dtype=options.dtype))
+    reader = ring.reader()
+
+    columns = get_record_columns(model, options.get_record_keys(model))
+    store = RECORDER_STORES[options.record_format](options.record_file, columns, dtype=options.dtype)
+
+    n_lost = 0
+    print(startup.report("Recorder"))
+
+    def drain():
+
+        # Rows overwritten before being read can not be recovered
+        n_not_read = max(0, reader.n_pending - ring.size)
+
+        rows = reader.read_new()
+        if len(rows) > 0:
+            store.append(rows)
+
+        return n_not_read
+
+    while not stop_flag.is_set():
+
+        start_time = time.time()
+        n_lost += drain()
+
+        sleep_time = max(0., options.t_sleep_max_record - (time.time() - start_time))
+        time.sleep(sleep_time)
+
+    # The last rows are drained once the worker has finished writing. A worker that crashed
+    # never finishes: then the drain stops when no rows arrive for "record_finish_timeout"
+    last_count = ring.count
+    last_change = time.time()
+
+    while not ring.is_finished and time.time() - last_change < options.record_finish_timeout:
+
+        n_lost += drain()
+        time.sleep(options.t_sleep_max)
+
+        if not ring.count == last_count:
+            last_count = ring.count
+            last_change = time.time()
+
+    n_lost += drain()
+
+    store.close()
+    attachments.release_all()
+    print("Recorder finished! ({} rows written to '{}', {} rows lost)".format(store.n_rows, options.record_file, n_lost))
@@ -0,0 +1,330 @@
+import multiprocessing.shared_memory as shm
+import numpy as np
+import time
+
+
+class SharedRingBuffer:
+
+    """
+        Fixed size ring of rows stored in a SharedMemory segment together with its header:
+
+            [0] head        index of the next row to be written
+            [1] count       total number of rows written since the creation
+            [2] sequence    incremented before and after each write (odd while writing)
+            [3] finished    set by the writer after its last write (see "finish")
+
+        There must be only one writer. Readers never lock: they check the sequence counter
+        before and after reading and retry if a write happened meanwhile, hence they never
+        get torn rows and never need to sort the buffer.
+    """
+
+    HEAD = 0
+    COUNT = 1
+    SEQUENCE = 2
+    FINISHED = 3
+    N_HEADER = 4
+
+    def __init__(self, shared_mem: shm.SharedMemory, shape, dtype=np.float64, owner=False, offset=0):
+
+        self.shared_mem = shared_mem
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.dtype = np.dtype(dtype)
+        self.owner = owner
+        self.offset = offset
+        self.last_rows = None           # Last consistent copy returned by "read" (in this process)
+
+        self.header = np.ndarray((self.N_HEADER,), dtype=np.int64, buffer=shared_mem.buf, offset=offset)
+        self.data = np.ndarray(
+
+            self.shape, dtype=self.dtype, buffer=shared_mem.buf,
+            offset=offset + self.N_HEADER * np.dtype(np.int64).itemsize
+
+        )
+
+    @classmethod
+    def get_memory_size(cls, shape, dtype=np.float64) -> int:
+        return int(cls.N_HEADER * np.dtype(np.int64).itemsize + np.prod(shape) * np.dtype(dtype).itemsize)
+
+    @classmethod
+    def create(cls, shape, dtype=np.float64, name=None):
+
+        shared_mem = shm.SharedMemory(name=name, create=True, size=cls.get_memory_size(shape, dtype))
+        ring = cls(shared_mem, shape, dtype, owner=True)
+        ring.header[:] = 0
+        ring.data[:] = np.nan
+        return ring
+
+    @classmethod
+    def attach(cls, name, shape, dtype=np.float64):
+        return cls(shm.SharedMemory(name=name), shape, dtype)
+
+    @property
+    def name(self) -> str:
+        return self.shared_mem.name
+
+    @property
+    def size(self) -> int:
+        return self.shape[0]
+
+    @property
+    def count(self) -> int:
+        return int(self.header[self.COUNT])
+
+    @property
+    def sequence(self) -> int:
+        return int(self.header[self.SEQUENCE])
+
+    @property
+    def is_finished(self) -> bool:
+        return bool(self.header[self.FINISHED])
+
+    # <------------------------------------------------------------------------->
+    # WRITER
+    # <------------------------------------------------------------------------->
+
+    def write(self, row):
+
+        head = self.header[self.HEAD]
+
+        self.header[self.SEQUENCE] += 1
+        self.data[head, :] = row
+        self.header[self.HEAD] = (head + 1) % self.size
+        self.header[self.COUNT] += 1
+        self.header[self.SEQUENCE] += 1
+
+    def write_rows(self, rows):
+
+        rows = np.asarray(rows, dtype=self.dtype)
+        if len(rows) == 0:
+            return
+
+        if len(rows) > self.size:
+            self.header[self.COUNT] += len(rows) - self.size
+            rows = rows[-self.size:]
+
+        head = int(self.header[self.HEAD])
+        indices = (head + np.arange(len(rows))) % self.size
+
+        self.header[self.SEQUENCE] += 1
+        self.data[indices, :] = rows
+        self.header[self.HEAD] = (head + len(rows)) % self.size
+        self.header[self.COUNT] += len(rows)
+        self.header[self.SEQUENCE] += 1
+
+    def reset(self):
+
+        self.header[self.SEQUENCE] += 1
+        self.data[:] = np.nan
+        self.header[self.HEAD] = 0
+        self.header[self.COUNT] = 0
+        self.header[self.FINISHED] = 0
+        self.header[self.SEQUENCE] += 1
+
+    def finish(self):
+
+        """Tells the readers that no more rows will be written (e.g. for a final drain)."""
+
+        self.header[self.FINISHED] = 1
+
+    # <------------------------------------------------------------------------->
+    # READERS
+    # <------------------------------------------------------------------------->
+
+    def segments(self):
+
+        """
+            Zero-copy views (older rows, newer rows) of the current content in time order.
+            The views are not protected against concurrent writes, use "read" to get a safe copy.
+        """
+
+        head = int(self.header[self.HEAD])
+        count = int(self.header[self.COUNT])
+
+        if count < self.size:
+            return self.data[:0], self.data[:count]
+
+        return self.data[head:], self.data[:head]
+
+    def read(self, max_rows=None, max_retries=100) -> np.ndarray:
+
+        """
+            Consistent copy of (at most the last "max_rows") rows in time order. If every one of
+            the "max_retries" attempts overlaps a write, the last consistent copy is returned.
+        """
+
+        for i in range(max_retries):
+
+            sequence = self.header[self.SEQUENCE]
+            if sequence % 2 == 1:
+                time.sleep(0)
+                continue
+
+            older, newer = self.segments()
+            if max_rows is not None and len(older) + len(newer) > max_rows:
+
+                if len(newer) >= max_rows:
+                    older, newer = self.data[:0], newer[len(newer) - max_rows:]
+
+                else:
+                    older = older[len(older) + len(newer) - max_rows:]
+
+            rows = np.concatenate((older, newer))
+
+            if self.header[self.SEQUENCE] == sequence:
+                self.last_rows = rows
+                return rows
+
+            # Gives the writer the time to complete its write
+            time.sleep(0)
+
+        if self.last_rows is None:
+            raise RuntimeError("No consistent copy of the ring buffer after {} attempts".format(max_retries))
+
+        if max_rows is not None:
+            return self.last_rows[len(self.last_rows) - min(max_rows, len(self.last_rows)):]
+
+        return self.last_rows
+
+    def read_new(self, last_count, max_retries=100):
+
+        """
+            Rows written after the reader saw "last_count" rows (at most the whole buffer).
+            Returns (rows, count): pass "count" as "last_count" in the next call.
+        """
+
+        for i in range(max_retries):
+
+            sequence = self.header[self.SEQUENCE]
+            if sequence % 2 == 1:
+                time.sleep(0)
+                continue
+
+            count = int(self.header[self.COUNT])
+            head = int(self.header[self.HEAD])
+            n_new = min(count - last_count, self.size)
+
+            if n_new <= 0:
+                rows = self.data[:0].copy()
+
+            else:
+                indices = (head - n_new + np.arange(n_new)) % self.size
+                rows = self.data[indices]
+
+            if self.header[self.SEQUENCE] == sequence:
+                return rows, count
+
+            time.sleep(0)
+
+        return self.data[:0].copy(), last_count
+
+    def reader(self):
+        return RingBufferReader(self)
+
+    # <------------------------------------------------------------------------->
+    # CLEAN-UP
+    # <------------------------------------------------------------------------->
+
+    def close(self):
+
+        # The numpy views must be released before closing the segment
+        self.header = None
+        self.data = None
+        self.shared_mem.close()
+
+    def unlink(self):
+        self.shared_mem.unlink()
+
+
+class RingArena:
+
+    """
+        Several SharedRingBuffer (identified by a key) stored one after the other in a single
+        SharedMemory segment, so that many buffers need only one segment name to be attached.
+    """
+
+    ALIGNMENT = 64
+
+    def __init__(self, shared_mem: shm.SharedMemory, shapes: dict, dtype=np.float64, owner=False):
+
+        self.shared_mem = shared_mem
+        self.shapes = dict(shapes)
+        self.dtype = np.dtype(dtype)
+        self.owner = owner
+
+        self.rings = dict()
+        offsets, total_size = self.get_layout(self.shapes, self.dtype)
+        for key, offset in offsets.items():
+            self.rings[key] = SharedRingBuffer(shared_mem, self.shapes[key], self.dtype, owner=owner, offset=offset)
+
+    @classmethod
+    def get_layout(cls, shapes: dict, dtype=np.float64):
+
+        """Offsets of the rings in the segment (aligned to ALIGNMENT bytes) and total size."""
+
+        offsets = dict()
+        offset = 0
+
+        for key, shape in shapes.items():
+
+            offsets[key] = offset
+            size = SharedRingBuffer.get_memory_size(shape, dtype)
+            offset += int(np.ceil(size / cls.ALIGNMENT) * cls.ALIGNMENT)
+
+        return offsets, offset
+
+    @classmethod
+    def get_memory_size(cls, shapes: dict, dtype=np.float64) -> int:
+        return max(cls.get_layout(shapes, dtype)[1], 1)
+
+    @classmethod
+    def create(cls, shapes: dict, dtype=np.float64, name=None):
+
+        shared_mem = shm.SharedMemory(name=name, create=True, size=cls.get_memory_size(shapes, dtype))
+        arena = cls(shared_mem, shapes, dtype, owner=True)
+
+        for ring in arena.rings.values():
+            ring.header[:] = 0
+            ring.data[:] = np.nan
+
+        return arena
+
+    @classmethod
+    def attach(cls, name, shapes: dict, dtype=np.float64):
+        return cls(shm.SharedMemory(name=name), shapes, dtype)
+
+    @property
+    def name(self) -> str:
+        return self.shared_mem.name
+
+    def __getitem__(self, key) -> SharedRingBuffer:
+        return self.rings[key]
+
+    def close(self):
+
+        for ring in self.rings.values():
+            ring.header = None
+            ring.data = None
+
+        self.shared_mem.close()
+
+    def unlink(self):
+        self.shared_mem.unlink()
+
+
+class RingBufferReader:
+
+    """Keeps track of the rows already read from a SharedRingBuffer."""
+
+    def __init__(self, ring: SharedRingBuffer):
+
+        self.ring = ring
+        self.last_count = 0
+
+    def read_new(self) -> np.ndarray:
+
+        rows, self.last_count = self.ring.read_new(self.last_count)
+        return rows
+
+    @property
+    def n_pending(self) -> int:
+        return self.ring.count - self.last_count
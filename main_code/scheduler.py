@@ -0,0 +1,170 @@
+import numpy as np
+import time
+
+
+class SchedulerStats:
+
+    def __init__(self):
+
+        self.n_cycles = 0           # calls of "wait"
+        self.n_steps = 0            # steps requested to the caller
+        self.n_late = 0             # cycles started after their deadline
+        self.n_missed = 0           # deadlines skipped without performing the step
+        self.max_lateness = 0.      # [s]
+        self.sum_jitter = 0.        # [s] sum of |wake-up time - deadline| of the on-time cycles
+        self.max_jitter = 0.        # [s]
+        self.busy_time = 0.         # [s] time spent outside "wait"
+        self.total_time = 0.        # [s]
+
+    @property
+    def mean_jitter(self) -> float:
+
+        n_on_time = self.n_cycles - self.n_late
+        if n_on_time <= 0:
+            return 0.
+
+        return self.sum_jitter / n_on_time
+
+    @property
+    def occupation(self) -> float:
+
+        if self.total_time <= 0:
+            return 0.
+
+        return self.busy_time / self.total_time
+
+    def as_dict(self) -> dict:
+
+        return {
+
+            "n_cycles": self.n_cycles, "n_steps": self.n_steps,
+            "n_late": self.n_late, "n_missed": self.n_missed,
+            "max_lateness": self.max_lateness,
+            "mean_jitter": self.mean_jitter, "max_jitter": self.max_jitter,
+            "occupation": self.occupation
+
+        }
+
+
+class RealTimeScheduler:
+
+    """
+        Paces a loop on absolute deadlines of a monotonic clock (deadline n = start + n * period),
+        hence sleep overshoots do not accumulate. "wait" sleeps until the next deadline and returns
+        the number of steps that the caller has to perform. When the loop falls behind:
+
+            "skip"      the missed deadlines are dropped (1 step, the simulated time falls behind)
+            "batch"     the missed steps are performed back to back (at most "max_batch" at once)
+            "degrade"   the period is stretched to what the loop can sustain and then slowly
+                        brought back to the nominal value when there is slack again
+
+        With period = 0 the loop runs as fast as possible (no sleep at all).
+    """
+
+    CATCH_UP_POLICIES = ["skip", "batch", "degrade"]
+
+    def __init__(self, period, catch_up="batch", max_batch=10, max_degrade=10., spin_time=0.0002):
+
+        if catch_up not in self.CATCH_UP_POLICIES:
+            raise ValueError("Unknown catch up policy '{}' (use one of {})".format(catch_up, self.CATCH_UP_POLICIES))
+
+        self.nominal_period = period
+        self.period = period
+        self.catch_up = catch_up
+        self.max_batch = max(1, int(max_batch))
+        self.max_degrade = max_degrade
+        self.spin_time = spin_time
+
+        self.stats = SchedulerStats()
+        self.next_deadline = None
+        self.__last_return = None
+
+    def reset(self):
+
+        """Restarts the deadlines from now (e.g. after a pause), stats are kept."""
+
+        self.next_deadline = None
+        self.__last_return = None
+
+    def __sleep_until(self, deadline):
+
+        # Coarse sleep followed by a short busy wait to hit the deadline precisely
+        remaining = deadline - time.perf_counter()
+        if remaining > self.spin_time:
+            time.sleep(remaining - self.spin_time)
+
+        while time.perf_counter() < deadline:
+            pass
+
+    def wait(self) -> int:
+
+        now = time.perf_counter()
+
+        if self.__last_return is not None:
+            self.stats.busy_time += now - self.__last_return
+            self.stats.total_time += now - self.__last_return
+
+        if self.next_deadline is None:
+            self.next_deadline = now
+
+        n_steps = 1
+        lateness = now - self.next_deadline
+
+        if self.period <= 0:
+            self.next_deadline = now
+
+        elif lateness <= 0:
+
+            self.__sleep_until(self.next_deadline)
+            jitter = abs(time.perf_counter() - self.next_deadline)
+            self.stats.sum_jitter += jitter
+            self.stats.max_jitter = max(self.stats.max_jitter, jitter)
+
+            self.next_deadline += self.period
+
+            if self.catch_up == "degrade" and self.period > self.nominal_period and -lateness > self.period / 2:
+                self.period = max(self.nominal_period, self.period * 0.95)
+
+        else:
+
+            self.stats.n_late += 1
+            self.stats.max_lateness = max(self.stats.max_lateness, lateness)
+            n_behind = int(np.floor(lateness / self.period)) + 1
+
+            if self.catch_up == "skip":
+
+                self.stats.n_missed += n_behind - 1
+                self.next_deadline += n_behind * self.period
+
+            elif self.catch_up == "batch":
+
+                n_steps = min(n_behind, self.max_batch)
+                self.stats.n_missed += n_behind - n_steps
+
+                if n_behind > self.max_batch:
+                    self.next_deadline = now + self.period
+
+                else:
+                    self.next_deadline += n_steps * self.period
+
+            else:
+
+                self.period = min(self.period * 1.25, self.nominal_period * self.max_degrade)
+                self.next_deadline = now + self.period
+
+        self.__last_return = time.perf_counter()
+        self.stats.total_time += self.__last_return - now
+        self.stats.n_cycles += 1
+        self.stats.n_steps += n_steps
+
+        return n_steps
+
+    @property
+    def rate_ratio(self) -> float:
+
+        """Current rate over the nominal one (lower than 1 when degraded)."""
+
+        if self.period <= 0:
+            return 1.
+
+        return self.nominal_period / self.period
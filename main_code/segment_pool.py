@@ -0,0 +1,196 @@
+from main_code.ring_buffer import SharedRingBuffer, RingArena
+from main_code.control_block import ControlBlock
+import multiprocessing.shared_memory as shm
+import numpy as np
+import uuid
+import os
+
+
+# Segments are named "lse_<pid of the owner>_<id>" so that orphans can be found and removed
+SEGMENT_PREFIX = "lse"
+SHM_DIR = "/dev/shm"
+
+
+def get_segment_name() -> str:
+    return "{}_{}_{}".format(SEGMENT_PREFIX, os.getpid(), uuid.uuid4().hex[:8])
+
+
+def get_segment_pid(name):
+
+    parts = name.lstrip("/").split("_")
+    if len(parts) == 3 and parts[0] == SEGMENT_PREFIX and parts[1].isdigit():
+        return int(parts[1])
+
+    return None
+
+
+def is_process_alive(pid) -> bool:
+
+    try:
+        os.kill(pid, 0)
+
+    except ProcessLookupError:
+        return False
+
+    except PermissionError:
+        return True
+
+    return True
+
+
+def sweep_orphan_segments(verbose=True) -> list:
+
+    """
+        Unlinks the segments left by processes that are no longer running (e.g. killed before
+        their teardown). Returns a list of (name, size). Only needed on POSIX systems: on
+        Windows a segment is freed as soon as its last handle is closed.
+    """
+
+    if not os.path.isdir(SHM_DIR):
+        return list()
+
+    removed = list()
+    for name in os.listdir(SHM_DIR):
+
+        pid = get_segment_pid(name)
+        if pid is None or is_process_alive(pid):
+            continue
+
+        try:
+            size = os.path.getsize(os.path.join(SHM_DIR, name))
+            segment = shm.SharedMemory(name=name)
+            segment.close()
+            segment.unlink()
+            removed.append((name, size))
+
+        except FileNotFoundError:
+            pass
+
+    if verbose and len(removed) > 0:
+        print("Removed {} orphan shared memory segments ({})".format(len(removed), format_size(sum(size for name, size in removed))))
+
+    return removed
+
+
+def format_size(size) -> str:
+
+    for unit in ["B", "kB", "MB"]:
+        if size < 1024:
+            return "{:.1f} {}".format(size, unit)
+
+        size /= 1024
+
+    return "{:.1f} GB".format(size)
+
+
+class SegmentPool:
+
+    """
+        Shared-memory segments (rings, arenas and control blocks) identified by a key ("main",
+        "history/1" ...) and released together, as a context manager:
+
+            with SegmentPool() as pool:
+                ring = pool.get_ring("main", shape)
+
+        The owner (the launching process) closes and unlinks its segments when the pool is
+        released, even after an error. "run_simulation" uses a pool for a single run,
+        SimulationService keeps it between runs: a segment requested again with the same
+        layout is reset and reused instead of being unlinked and allocated again.
+
+        The processes attaching to the segments use a pool with owner=False to collect their
+        attachments ("register"), which are only closed.
+    """
+
+    def __init__(self, owner=True):
+
+        self.owner = owner
+        self.segments = dict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release_all()
+        return False
+
+    def register(self, key, segment):
+
+        """Adds an existing segment (anything with "shared_mem", "close" and "unlink")."""
+
+        self.release(key)
+        self.segments[key] = segment
+        return segment
+
+    def get_ring(self, key, shape, dtype=np.float64) -> SharedRingBuffer:
+
+        ring = self.segments.get(key, None)
+        if isinstance(ring, SharedRingBuffer) and ring.shape == tuple(shape) and ring.dtype == np.dtype(dtype):
+            ring.reset()
+            return ring
+
+        return self.register(key, SharedRingBuffer.create(shape, dtype=dtype, name=get_segment_name()))
+
+    def get_arena(self, key, shapes: dict, dtype=np.float64) -> RingArena:
+
+        arena = self.segments.get(key, None)
+        if isinstance(arena, RingArena) and arena.shapes == dict(shapes) and arena.dtype == np.dtype(dtype):
+
+            for ring in arena.rings.values():
+                ring.reset()
+
+            return arena
+
+        return self.register(key, RingArena.create(shapes, dtype=dtype, name=get_segment_name()))
+
+    def get_block(self, key, initial_values: dict, block_class=ControlBlock) -> ControlBlock:
+
+        """"initial_values" as in "block_class.create", the stop flag is cleared on reuse."""
+
+        values = dict(block_class.COMMON_PARAMS)
+        values.update(initial_values)
+
+        block = self.segments.get(key, None)
+        if type(block) is block_class and block.fields == list(values.keys()):
+            block.write_values(values)
+            block.write(block_class.STOP, 0)
+            return block
+
+        return self.register(key, block_class.create(initial_values, name=get_segment_name()))
+
+    def release(self, key):
+
+        segment = self.segments.pop(key, None)
+        if segment is None:
+            return
+
+        try:
+            segment.close()
+
+        except BufferError:
+            # Views still exported by the process: the mapping is released when it exits
+            pass
+
+        if self.owner:
+            try:
+                segment.unlink()
+
+            except FileNotFoundError:
+                pass
+
+    def release_all(self):
+
+        for key in list(self.segments.keys()):
+            self.release(key)
+
+    @property
+    def memory_size(self) -> int:
+        return sum(segment.shared_mem.size for segment in self.segments.values())
+
+    def report(self) -> str:
+
+        lines = ["{:<14}{:<24}{:>12}".format("segment", "name", "size")]
+        for key, segment in self.segments.items():
+            lines.append("{:<14}{:<24}{:>12}".format(key, segment.shared_mem.name, format_size(segment.shared_mem.size)))
+
+        lines.append("{:<38}{:>12}".format("total", format_size(self.memory_size)))
+        return "\n".join(lines)
@@ -0,0 +1,290 @@
+from main_code.dynamic_classes.dynamic_abstract_class import AbstractDynamicModel, keyboard
+from main_code.control_block import ControlBlock, ControlSnapshot
+from main_code.multiprocessing_calculation import CalculatorOptions, run_process, stop_processes
+from main_code.segment_pool import SegmentPool, sweep_orphan_segments
+from main_code.lazy_import import LazyModule
+from main_code.profiling import StartupTimer
+from main_code.ring_buffer import RingArena
+from main_code.live_plot import LivePlot, BlitManager
+import multiprocessing
+import time
+
+
+plt = LazyModule("matplotlib.pyplot")
+
+
+class SimulationSession:
+
+    """
+        Runs several models side by side with a single process topology: the models are
+        distributed over "n_workers" calculation processes, their buffers are stored in one
+        shared-memory arena and all of them are drawn by one plotting process.
+
+        Keyboard: TAB selects the model receiving the model specific keys, ESC, SPACE and
+        the arrows act on the whole session (time scale and pause are shared).
+    """
+
+    def __init__(self, options: CalculatorOptions = None, n_workers=1):
+
+        self.options = options if options is not None else CalculatorOptions()
+        self.n_workers = max(1, int(n_workers))
+        self.models = dict()
+
+    def add_model(self, model: AbstractDynamicModel, name=None) -> str:
+
+        if name is None:
+            name = "{}_{}".format(type(model).__name__, len(self.models))
+
+        if name in self.models:
+            raise ValueError("A model named '{}' is already in the session".format(name))
+
+        self.models[name] = model
+        return name
+
+    def get_shapes(self) -> dict:
+
+        # Same rows as "run_simulation" (ensemble blocks are flattened, see "session_worker")
+        return {name: self.options.get_shape(model) for name, model in self.models.items()}
+
+    def get_worker_groups(self) -> list:
+
+        """Names of the models assigned to each worker (round robin)."""
+
+        names = list(self.models.keys())
+        n_workers = min(self.n_workers, len(names))
+        return [names[i::n_workers] for i in range(n_workers)]
+
+    @staticmethod
+    def get_prefix(name) -> str:
+        return "{}/".format(name)
+
+    def init_control_block(self, pool: SegmentPool) -> ControlBlock:
+
+        # "dt_%" and "pause" are shared by all the models, the model params are prefixed by the name
+        fields = dict()
+        for name, model in self.models.items():
+            fields.update(ControlBlock.get_fields(model.get_shared_params(), prefix=self.get_prefix(name)))
+
+        return pool.get_block("control", fields)
+
+    def get_shared_params(self, control_block: ControlBlock) -> dict:
+        return {name: control_block.get_params(prefix=self.get_prefix(name)) for name in self.models.keys()}
+
+    def run(self):
+
+        if len(self.models) == 0:
+            raise ValueError("No model has been added to the session")
+
+        sweep_orphan_segments()
+
+        with SegmentPool() as pool:
+
+            control_block = self.init_control_block(pool)
+            stop_flag = control_block.stop_flag
+            shared_params = self.get_shared_params(control_block)
+
+            shapes = self.get_shapes()
+            arena = pool.get_arena("arena", shapes, dtype=self.options.dtype)
+            print(pool.report())
+
+            targets = list()
+            startup = StartupTimer()
+            for group in self.get_worker_groups():
+
+                targets.append((session_worker, (
+
+                    {name: self.models[name] for name in group}, self.options, arena.name,
+                    shapes, stop_flag, {name: shared_params[name] for name in group}, startup
+
+                )))
+
+            targets.append((session_plot, (
+
+                self.models, self.options, arena.name, shapes, stop_flag, shared_params, startup
+
+            )))
+
+            processes = list()
+            try:
+
+                for target, args in targets:
+                    processes.append(multiprocessing.Process(target=run_process, args=(target, args, stop_flag)))
+                    processes[-1].start()
+
+                session_keyboard_listener(self.models, stop_flag, shared_params)
+
+            finally:
+                stop_processes(processes, stop_flag)
+
+
+def session_worker(models: dict, options, arena_name, shapes, stop_flag, shared_params, startup=None):
+
+    """Advances all the models of a worker group on the same real-time deadlines."""
+
+    startup = StartupTimer() if startup is None else startup
+    startup.mark("imports")
+
+    for model in models.values():
+        model.initialize_role("worker")
+
+    startup.mark("initialize")
+
+    attachments = SegmentPool(owner=False)
+    attachments.register("control", stop_flag.block)
+    arena = attachments.register("arena", RingArena.attach(arena_name, shapes, dtype=options.dtype))
+    decimators = {name: options.get_decimator() for name in models.keys()}
+    controls = {name: ControlSnapshot(shared_params[name]) for name in models.keys()}
+    common_control = next(iter(controls.values()))
+
+    print(startup.report("Session worker ({})".format(", ".join(models.keys()))))
+
+    scheduler = options.get_scheduler()
+    while not stop_flag.is_set():
+
+        if common_control.update()["pause"].value:
+            scheduler.reset()
+            time.sleep(options.t_sleep_max_plot)
+            continue
+
+        n_steps = scheduler.wait()
+
+        for i in range(n_steps):
+
+            dt = options.dt * common_control.update()["dt_%"].value
+            for name, model in models.items():
+
+                model.update(dt, controls[name].update())
+
+                # Ensemble blocks (n_members, n_elements) are written as one row, members one after the other
+                decimated_rows = decimators[name].push(model.export_variables().ravel())
+                if decimated_rows is not None:
+                    arena[name].write_rows(decimated_rows)
+
+    attachments.release_all()
+
+    stats = scheduler.stats
+    print(
+
+        "Session worker finished! (cycle occupation: {:.2f}%, iterations: {}, late: {}, missed: {})".format(
+            stats.occupation * 100,
+            stats.n_steps,
+            stats.n_late,
+            stats.n_missed
+
+        )
+
+    )
+
+
+def session_plot(models: dict, options, arena_name, shapes, stop_flag, shared_params, startup=None):
+
+    """One figure with a column for each model, the dashboard is shown in the title."""
+
+    startup = StartupTimer() if startup is None else startup
+    startup.mark("imports")
+
+    n_cols = len(models)
+    n_rows = max(len(model.y_labels) for model in models.values())
+
+    plt.ion()
+    fig, axs = plt.subplots(nrows=n_rows, ncols=n_cols, squeeze=False, figsize=(4 * n_cols, 2.5 * n_rows))
+
+    # A single manager for the whole figure: each one restores a background of the whole canvas
+    blit_manager = BlitManager(fig.canvas)
+    live_plots = dict()
+    for col, (name, model) in enumerate(models.items()):
+
+        y_labels = model.y_labels
+        axs[0, col].set_title(name)
+
+        for row in range(n_rows):
+
+            if row < len(y_labels):
+                axs[row, col].set_xlabel(model.x_label)
+                axs[row, col].set_ylabel(y_labels[row])
+
+            else:
+                axs[row, col].axis('off')
+
+        live_plots[name] = LivePlot(fig, axs[:len(y_labels), col], blit_manager=blit_manager)
+
+    common_params = next(iter(shared_params.values()))
+    status_text = fig.suptitle("")
+    plt.tight_layout()
+    plt.show(block=False)
+    fig.canvas.draw()
+
+    attachments = SegmentPool(owner=False)
+    attachments.register("control", stop_flag.block)
+    arena = attachments.register("arena", RingArena.attach(arena_name, shapes, dtype=options.dtype))
+    count = 0
+    mean_sleep_time = 0.
+
+    startup.mark("figure")
+    print(startup.report("Session plot"))
+
+    while not stop_flag.is_set():
+
+        start_time = time.time()
+
+        status = "Time scale: {:.0f}% - {}".format(
+
+            common_params["dt_%"].value * 100,
+            "Paused" if common_params["pause"].value else "Running"
+
+        )
+        if not status_text.get_text() == status:
+            status_text.set_text(status)
+            fig.canvas.draw()
+
+        # For the ensembles the first columns are the ones of the first member
+        rescaled = False
+        for name, live_plot in live_plots.items():
+
+            rows = arena[name].read()
+            rescaled = live_plot.set_data(rows[:, 0], [rows[:, n + 1] for n in range(len(live_plot.lines))]) or rescaled
+
+        if rescaled:
+            fig.canvas.draw()
+
+        blit_manager.update()
+
+        t_sleep_max = options.t_sleep_max_plot
+        elapsed_time = time.time() - start_time
+        sleep_time = max(0., t_sleep_max - elapsed_time)
+
+        mean_sleep_time += sleep_time / t_sleep_max
+        count += 1
+
+        time.sleep(sleep_time)
+
+    plt.ioff()
+    plt.close(fig)
+    attachments.release_all()
+
+    occupation = 1 - mean_sleep_time / max(count, 1)
+    print("Session plot finished! (cycle occupation: {:.2f}%, iterations: {})".format(occupation * 100, count))
+
+
+def session_keyboard_listener(models: dict, stop_flag, shared_params):
+
+    names = list(models.keys())
+    active = [0]
+
+    def on_press(key):
+
+        if key == keyboard.Key.tab:
+            active[0] = (active[0] + 1) % len(names)
+            print("Active model: {}".format(names[active[0]]))
+            return True
+
+        name = names[active[0]]
+        return models[name].on_key_pressed(key, stop_flag, shared_params[name])
+
+    print("Listener started! (active model: {}, TAB to change it)".format(names[active[0]]))
+
+    with keyboard.Listener(on_press=on_press) as listener:
+        while listener.running and not stop_flag.is_set():
+            listener.join(0.1)
+
+    print("Listener finished!")
@@ -0,0 +1,205 @@
+from main_code.multiprocessing_calculation import allocate_shared_memory, get_process_targets, keyboard_listener
+from main_code.dynamic_classes.dynamic_abstract_class import AbstractDynamicModel
+from main_code.multiprocessing_calculation import CalculatorOptions
+from main_code.segment_pool import SegmentPool, sweep_orphan_segments
+from main_code.profiling import StartupTimer
+from multiprocessing import resource_tracker
+import multiprocessing
+import traceback
+import queue
+import time
+
+
+class SimulationService:
+
+    """
+        Keeps the processes of "run_simulation" (worker, dashboard, plots, recorder) alive
+        between successive runs, so that interpreter start-up and imports are paid once per
+        service instead of once per run. The shared-memory segments are also kept and reused
+        by the next run when their layout does not change.
+
+            with SimulationService() as service:
+
+                service.run(Evaporator(), options, duration=10.)     # stopped after 10 s
+                service.run(BoilerDynamicModel(), options)           # stopped with ESC
+
+        Each warm process receives its jobs (run id, target, args) over its own queue and
+        reports on a shared one. The reports are tagged with the run id (those left by an
+        interrupted run are discarded) and the processes that die without reporting (e.g.
+        a crash in REFPROP) are detected and started again.
+    """
+
+    def __init__(self, n_processes=3, join_timeout=10.):
+
+        self.n_processes = n_processes
+        self.join_timeout = join_timeout            # Time given to the processes to finish after the stop [s]
+        self.pool = SegmentPool()
+        self.processes = list()
+        self.job_queues = list()
+        self.done_queue = None
+        self.n_runs = 0
+
+    def start(self):
+
+        sweep_orphan_segments()
+
+        # The processes must share the tracker of this process: the one started by a process
+        # attaching a segment would unlink all the segments if that process was killed
+        resource_tracker.ensure_running()
+
+        self.done_queue = multiprocessing.Queue()
+        self.add_processes(self.n_processes)
+
+    def add_processes(self, n_processes):
+
+        for i in range(n_processes):
+
+            self.job_queues.append(None)
+            self.processes.append(None)
+            self.start_process(len(self.processes) - 1)
+
+    def start_process(self, index):
+
+        job_queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=service_loop, args=(index, job_queue, self.done_queue), daemon=True)
+        process.start()
+
+        self.job_queues[index] = job_queue
+        self.processes[index] = process
+
+    def restart_process(self, index):
+
+        process = self.processes[index]
+        if process.is_alive():
+            process.terminate()
+
+        process.join()
+        self.start_process(index)
+
+    def run(self, model: AbstractDynamicModel, options: CalculatorOptions, duration=None):
+
+        """
+            Runs the simulation on the warm processes, returns when it has been stopped: with
+            ESC (keyboard listener) if "duration" is None, otherwise after "duration" seconds.
+            Returns the errors raised by the processes (an empty list if none).
+        """
+
+        control_block, memory_names = allocate_shared_memory(model, options, self.pool)
+        targets = get_process_targets(model, options, memory_names, control_block, StartupTimer())
+
+        # Runs with more processes (thermo plot, recorder) start the missing ones once
+        if len(targets) > len(self.processes):
+            self.add_processes(len(targets) - len(self.processes))
+
+        for index in range(len(targets)):
+            if not self.processes[index].is_alive():
+                self.restart_process(index)
+
+        # Counted before the run, so that an interrupted run can not share its id with the next one
+        run_id = self.n_runs
+        self.n_runs += 1
+
+        for job_queue, (target, args) in zip(self.job_queues, targets):
+            job_queue.put((run_id, target, args))
+
+        stop_flag = control_block.stop_flag
+        try:
+
+            if duration is None:
+                keyboard_listener(model, stop_flag, control_block.get_params())
+
+            else:
+
+                # A crashed process stops the run as well (see "run_process")
+                end_time = time.time() + duration
+                while time.time() < end_time and not stop_flag.is_set():
+                    time.sleep(0.05)
+
+        finally:
+            stop_flag.set()
+
+        return self.collect_reports(run_id, set(range(len(targets))))
+
+    def collect_reports(self, run_id, pending: set) -> list:
+
+        """Waits for the report of the "pending" processes, returns the errors."""
+
+        errors = list()
+        deadline = time.time() + self.join_timeout
+        while len(pending) > 0:
+
+            try:
+                report_id, index, error = self.done_queue.get(timeout=0.1)
+
+            except queue.Empty:
+
+                for index in list(pending):
+
+                    process = self.processes[index]
+                    if not process.is_alive():
+                        errors.append("Process {} died without reporting (exit code {})".format(index, process.exitcode))
+
+                    elif time.time() > deadline:
+                        errors.append("Process {} did not finish within {} s".format(index, self.join_timeout))
+
+                    else:
+                        continue
+
+                    pending.discard(index)
+                    self.restart_process(index)
+
+                continue
+
+            # Reports of a previous (interrupted) run
+            if not report_id == run_id or index not in pending:
+                continue
+
+            pending.discard(index)
+            if error is not None:
+                errors.append(error)
+
+        return errors
+
+    def close(self, timeout=5.):
+
+        for job_queue in self.job_queues:
+            job_queue.put(None)
+
+        for process in self.processes:
+
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+        self.processes = list()
+        self.job_queues = list()
+        self.pool.release_all()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def service_loop(index, job_queue, done_queue):
+
+    """Warm process: executes the (run id, target, args) received until it gets None."""
+
+    while True:
+
+        job = job_queue.get()
+        if job is None:
+            break
+
+        run_id, target, args = job
+        try:
+            target(*args)
+            done_queue.put((run_id, index, None))
+
+        except Exception:
+            traceback.print_exc()
+            done_queue.put((run_id, index, traceback.format_exc()))
@@ -0,0 +1,6 @@
+from .batch_flash import flash_batch, saturation_batch, supports_arrays
+from .diagram_cache import calculate_cached, precompute_diagrams, get_diagram_key
+from .cached_point import CachedThermodynamicPoint, ThermoCache, enable_thermo_cache
+from .saturation_table import SaturationTable
+from .cache_utils import get_cache_dir, get_cache_path
+from .stub_backend import StubThermodynamicPoint
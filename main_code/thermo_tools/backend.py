@@ -0,0 +1,34 @@
+"""
+    Thermodynamic backend used by the models, selected at import time through the
+    LSE_THERMO_BACKEND environment variable:
+
+        "refprop"   REFPROPConnector (default, requires a REFPROP installation)
+        "stub"      StubThermodynamicPoint (analytic water and n-pentane, NumPy only)
+
+    e.g. "os.environ["LSE_THERMO_BACKEND"] = "stub"" before importing main_code.
+"""
+
+import os
+
+
+THERMO_BACKEND_ENV = "LSE_THERMO_BACKEND"
+THERMO_BACKENDS = ["refprop", "stub"]
+THERMO_BACKEND = os.environ.get(THERMO_BACKEND_ENV, "refprop").lower()
+
+if THERMO_BACKEND == "refprop":
+    from REFPROPConnector import ThermodynamicPoint, DiagramPlotter, DiagramPlotterOptions
+
+elif THERMO_BACKEND == "stub":
+
+    from main_code.thermo_tools.stub_backend import StubThermodynamicPoint as ThermodynamicPoint
+
+    # The diagram plotter only needs the ThermodynamicPoint interface, if available it is used as is
+    try:
+        from REFPROPConnector import DiagramPlotter, DiagramPlotterOptions
+
+    except ImportError:
+        DiagramPlotter = None
+        DiagramPlotterOptions = None
+
+else:
+    raise ValueError("Unknown thermodynamic backend '{}' (use one of {})".format(THERMO_BACKEND, THERMO_BACKENDS))
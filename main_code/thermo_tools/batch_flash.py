@@ -0,0 +1,83 @@
+import numpy as np
+
+
+def get_base_point(point):
+
+    # CachedThermodynamicPoint quantises scalar inputs: the wrapped point is used instead
+    while hasattr(point, "point") and hasattr(point, "cache"):
+        point = point.point
+
+    return point
+
+
+def supports_arrays(point) -> bool:
+
+    """True if "set_variable" accepts NumPy arrays (e.g. the stub backend)."""
+
+    return getattr(get_base_point(point), "supports_arrays", False)
+
+
+def flash_batch(point, input_1: tuple, input_2: tuple, outputs: list, errors="nan") -> dict:
+
+    """
+        Evaluates the "outputs" for all the pairs of inputs with a single call:
+
+            flash_batch(tp, ("H", h_values), ("rho", rho_values), ["T", "P", "Q"])
+
+        "input_1" and "input_2" are (variable name, values), the values can be scalars or arrays
+        that can be broadcast together. Returns {output: array with the broadcast shape}.
+
+        Backends working on arrays are called once. Otherwise each state is flashed only once
+        and all the outputs are read from it. The points of the caller are never modified. With
+        errors="nan" the states that cannot be evaluated return NaN, with errors="raise" the
+        exception is propagated.
+    """
+
+    name_1, values_1 = input_1
+    name_2, values_2 = input_2
+    values_1, values_2 = np.broadcast_arrays(np.asarray(values_1, dtype=float), np.asarray(values_2, dtype=float))
+
+    work_point = get_base_point(point).duplicate()
+
+    if supports_arrays(work_point):
+
+        work_point.set_variable(name_1, values_1)
+        work_point.set_variable(name_2, values_2)
+
+        return {
+
+            output: np.asarray(work_point.get_variable(output), dtype=float) * np.ones(values_1.shape)
+            for output in outputs
+
+        }
+
+    results = {output: np.full(values_1.shape, np.nan) for output in outputs}
+    for index in np.ndindex(values_1.shape):
+
+        try:
+
+            work_point.set_variable(name_1, values_1[index])
+            work_point.set_variable(name_2, values_2[index])
+
+            for output in outputs:
+                results[output][index] = work_point.get_variable(output)
+
+        except Exception:
+
+            if errors == "raise":
+                raise
+
+    return results
+
+
+def saturation_batch(point, variable, values, outputs=("P", "T", "rho", "h"), errors="nan"):
+
+    """
+        Saturated liquid (Q = 0) and vapour (Q = 1) properties for the "values" of "variable"
+        (e.g. "T" or "P"). Returns (liquid outputs, vapour outputs), two dictionaries of arrays.
+        "errors" as in "flash_batch".
+    """
+
+    liquid = flash_batch(point, (variable, values), ("Q", 0.), list(outputs), errors=errors)
+    vapour = flash_batch(point, (variable, values), ("Q", 1.), list(outputs), errors=errors)
+    return liquid, vapour
@@ -0,0 +1,29 @@
+import hashlib
+import os
+
+
+CACHE_DIR_ENV = "LSE_CACHE_DIR"
+
+
+def get_cache_dir() -> str:
+
+    # The folder can be moved (e.g. to a shared disk) through the LSE_CACHE_DIR variable
+    cache_dir = os.environ.get(CACHE_DIR_ENV, None)
+
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.expanduser("~"), ".laboratorio_sistemi_energetici", "cache")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def get_cache_path(prefix: str, key, cache_dir=None, extension=".npz") -> str:
+
+    if cache_dir is None:
+        cache_dir = get_cache_dir()
+
+    else:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    key_hash = hashlib.md5(repr(key).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, "{}_{}{}".format(prefix, key_hash, extension))
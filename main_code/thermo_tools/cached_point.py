@@ -0,0 +1,209 @@
+from collections import OrderedDict
+
+
+class ThermoCache:
+
+    """Bounded LRU store of evaluated properties shared by the points of the same fluid."""
+
+    def __init__(self, max_size=10000):
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.__values = OrderedDict()
+
+    def get(self, key):
+
+        value = self.__values.get(key, None)
+
+        if value is None:
+            self.misses += 1
+
+        else:
+            self.hits += 1
+            self.__values.move_to_end(key)
+
+        return value
+
+    def put(self, key, value):
+
+        self.__values[key] = value
+        self.__values.move_to_end(key)
+
+        if len(self.__values) > self.max_size:
+            self.__values.popitem(last=False)
+
+    def clear(self):
+
+        self.__values.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.__values)
+
+    @property
+    def hit_ratio(self) -> float:
+
+        n_calls = self.hits + self.misses
+        if n_calls == 0:
+            return 0.
+
+        return self.hits / n_calls
+
+    def __repr__(self):
+        return "ThermoCache(hits={}, misses={}, size={}/{})".format(self.hits, self.misses, self.size, self.max_size)
+
+
+class CachedThermodynamicPoint:
+
+    """
+        Wrapper of a ThermodynamicPoint with the same set_variable / get_variable interface.
+        The inputs are only stored when set: the wrapped point is flashed on a cache miss,
+        while the results of already visited (quantised) input pairs are returned directly.
+        Every other attribute (RPHandler, get_unit ...) is forwarded to the wrapped point.
+
+        The inputs are rounded to "significant_digits": a hit returns the properties of the
+        first input visited in the same interval, hence a relative error on the inputs up to
+        about 10^-significant_digits. With the boiler model (1500 s, step of the inlet flow)
+        6 digits give 33% of hits with a relative error below 4e-5 on T, P and m_dot_out,
+        10 digits never hit, 4 digits give a wrong outlet flow (42%).
+    """
+
+    def __init__(self, point, cache=None, significant_digits=6):
+
+        if cache is None:
+            cache = ThermoCache()
+
+        self.point = point
+        self.cache = cache
+        self.significant_digits = significant_digits
+
+        self.__inputs = list()
+        self.__synced = True
+
+    def set_variable(self, variable_name: str, variable_value: float, other_unit_system=None):
+
+        if other_unit_system is not None:
+            self.__sync()
+            self.__inputs = list()
+            self.point.set_variable(variable_name, variable_value, other_unit_system=other_unit_system)
+            return
+
+        # As in ThermodynamicPoint, the state is defined by the last two different variables set
+        name = variable_name.lower()
+        self.__inputs = [item for item in self.__inputs if not item[0] == name]
+        self.__inputs.append((name, variable_name, variable_value))
+        self.__inputs = self.__inputs[-2:]
+        self.__synced = False
+
+    def get_variable(self, variable_name: str, other_unit_system=None):
+
+        if other_unit_system is not None or len(self.__inputs) < 2:
+            self.__sync()
+            return self.point.get_variable(variable_name, other_unit_system=other_unit_system)
+
+        key = (self.__inputs_key, variable_name.lower())
+        value = self.cache.get(key)
+
+        if value is None:
+
+            self.__sync()
+            value = self.point.get_variable(variable_name)
+
+            if value is not None:
+                self.cache.put(key, value)
+
+        return value
+
+    @property
+    def __inputs_key(self) -> tuple:
+
+        return tuple(sorted(
+
+            (name, float("{:.{}g}".format(value, self.significant_digits)))
+            for name, __, value in self.__inputs
+
+        ))
+
+    def __sync(self):
+
+        if not self.__synced:
+
+            for __, variable_name, variable_value in self.__inputs:
+                self.point.set_variable(variable_name, variable_value)
+
+            self.__synced = True
+
+    def duplicate(self):
+
+        self.__sync()
+        new_point = CachedThermodynamicPoint(
+
+            self.point.duplicate(), cache=self.cache,
+            significant_digits=self.significant_digits
+
+        )
+        new_point.__inputs = list(self.__inputs)
+        return new_point
+
+    def copy_state_to(self, target_point):
+
+        self.__sync()
+        self.point.copy_state_to(target_point)
+
+    def __getattr__(self, item):
+
+        # Only called for attributes not defined in the wrapper (private ones are never forwarded)
+        if item == "point" or item.startswith("_"):
+            raise AttributeError(item)
+
+        self.__sync()
+        return getattr(self.point, item)
+
+
+def is_thermodynamic_point(obj) -> bool:
+
+    return (
+
+        hasattr(type(obj), "set_variable") and
+        hasattr(type(obj), "get_variable") and
+        hasattr(obj, "RPHandler")
+
+    )
+
+
+def get_fluid_key(point) -> tuple:
+
+    rp_handler = point.RPHandler
+    return tuple(rp_handler.fluids), tuple(rp_handler.composition), str(rp_handler.unit_system)
+
+
+def enable_thermo_cache(model, max_size=10000, significant_digits=6, caches=None) -> dict:
+
+    """
+        Replaces every ThermodynamicPoint attribute of "model" with a CachedThermodynamicPoint.
+        Points of the same fluid share the same ThermoCache. Returns {fluid key: ThermoCache}.
+    """
+
+    if caches is None:
+        caches = dict()
+
+    for name, value in list(vars(model).items()):
+
+        if isinstance(value, CachedThermodynamicPoint) or not is_thermodynamic_point(value):
+            continue
+
+        fluid_key = get_fluid_key(value)
+        if fluid_key not in caches:
+            caches[fluid_key] = ThermoCache(max_size=max_size)
+
+        setattr(model, name, CachedThermodynamicPoint(
+
+            value, cache=caches[fluid_key],
+            significant_digits=significant_digits
+
+        ))
+
+    return caches
@@ -0,0 +1,252 @@
+from main_code.thermo_tools.batch_flash import flash_batch, supports_arrays
+from main_code.thermo_tools.cache_utils import get_cache_path
+from main_code.thermo_tools.backend import THERMO_BACKEND
+from multiprocessing import Pool
+import numpy as np
+import os
+
+
+def to_float_tuple(values) -> tuple:
+    return tuple(float(value) for value in values)
+
+
+def get_diagram_key(plotter) -> tuple:
+
+    """Everything the geometry of a DiagramPlotter depends on (fluid, axes, ranges and number of points)."""
+
+    rp_handler = plotter.support_point.RPHandler
+    options = plotter.options
+
+    isoline_ranges = tuple(
+
+        (str(name), to_float_tuple(options.isoline_ranges[name][:2]), int(options.isoline_ranges[name][2]))
+        for name in options.isoline_ranges.keys()
+
+    )
+
+    return (
+
+        THERMO_BACKEND, tuple(rp_handler.fluids), to_float_tuple(rp_handler.composition), str(rp_handler.unit_system),
+        options.x_ax, to_float_tuple(options.x_ax_rng), bool(options.x_ax_log),
+        options.y_ax, to_float_tuple(options.y_ax_rng), bool(options.y_ax_log),
+        isoline_ranges, int(options.n_sat_points), int(options.n_isolines_points),
+        bool(options.plot_saturation)
+
+    )
+
+
+def save_diagram(plotter, file_path):
+
+    # Isolines have different lengths: they are stored concatenated together with their offsets
+    labels = list()
+    offsets = [0]
+    iso_x = list()
+    iso_y = list()
+
+    for var_name, isolines in plotter.isolines_values.items():
+        for label, values in isolines.items():
+
+            labels.append("{}\t{}".format(var_name, label))
+            iso_x.extend(values["x"])
+            iso_y.extend(values["y"])
+            offsets.append(len(iso_x))
+
+    np.savez_compressed(
+
+        file_path,
+        plot_saturation=np.array(plotter.options.plot_saturation),
+        sat_x=np.asarray(plotter.sat_values["x"], dtype=float),
+        sat_y=np.asarray(plotter.sat_values["y"], dtype=float),
+        iso_labels=np.array(labels, dtype=str),
+        iso_var_names=np.array(list(plotter.isolines_values.keys()), dtype=str),
+        iso_offsets=np.array(offsets, dtype=np.int64),
+        iso_x=np.array(iso_x, dtype=float),
+        iso_y=np.array(iso_y, dtype=float)
+
+    )
+
+
+def load_diagram(plotter, file_path):
+
+    with np.load(file_path) as data:
+
+        plotter.options.plot_saturation = bool(data["plot_saturation"])
+        plotter.sat_values = {"x": data["sat_x"], "y": data["sat_y"]}
+        plotter.isolines_values = {str(var_name): dict() for var_name in data["iso_var_names"]}
+
+        offsets = data["iso_offsets"]
+        for i, full_label in enumerate(data["iso_labels"]):
+
+            var_name, label = str(full_label).split("\t", 1)
+            plotter.isolines_values[var_name].update({
+
+                label: {
+
+                    "x": data["iso_x"][offsets[i]:offsets[i + 1]],
+                    "y": data["iso_y"][offsets[i]:offsets[i + 1]]
+
+                }
+
+            })
+
+
+def get_grid(range_min, range_max, n_elements, log_scale=False) -> np.ndarray:
+
+    # Same grid of the DiagramPlotter
+    if log_scale:
+        return np.power(range_max / range_min, np.arange(n_elements) / (n_elements - 1)) * range_min
+
+    return np.arange(n_elements) / (n_elements - 1) * (range_max - range_min) + range_min
+
+
+def calculate_batch(plotter):
+
+    """
+        Same geometry of "plotter.calculate()" evaluated with one flash_batch call for each
+        curve (useful with backends working on arrays, see thermo_tools.batch_flash).
+    """
+
+    options = plotter.options
+    point = plotter.support_point
+    plotter.sat_values = options.initialized_sat_values
+    plotter.isolines_values = options.initialized_isolines_values
+
+    # Saturation curve (liquid side followed by the vapour side in reverse order)
+    if options.plot_saturation:
+
+        y_crit = point.RPHandler.PC if options.y_ax == "P" else point.RPHandler.TC
+        y_min, y_max = options.y_ax_rng[0], options.y_ax_rng[1]
+
+        y_upper = None
+        if y_min < y_crit < y_max:
+            y_upper = y_crit
+
+        elif y_crit > y_max:
+            y_upper = y_max
+
+        if y_upper is not None:
+
+            y_values = get_grid(y_min, y_upper, options.n_sat_points, log_scale=options.y_ax_log)
+            x_liq = flash_batch(point, (options.y_ax, y_values), ("Q", 0.), [options.x_ax])[options.x_ax]
+            x_vap = flash_batch(point, (options.y_ax, y_values), ("Q", 1.), [options.x_ax])[options.x_ax]
+
+            plotter.sat_values = {
+
+                "x": np.concatenate((x_liq, x_vap[::-1])),
+                "y": np.concatenate((y_values, y_values[::-1]))
+
+            }
+
+        else:
+            options.plot_saturation = False
+
+    x_values = options.get_range(options.n_isolines_points, return_x_ax=True)
+
+    # Iso-T (or iso-P) lines: horizontal inside the saturation dome
+    if options.calculate_tp_isoline:
+
+        tp_var = options.other_yax_variable
+        tp_crit = point.RPHandler.TC if tp_var == "T" else point.RPHandler.PC
+        y_limit = options.y_ax_rng[1] * 2
+        tp_spec = options.isoline_ranges[tp_var]
+
+        for tp in get_grid(tp_spec[0], tp_spec[1], tp_spec[2]):
+
+            y_values = flash_batch(point, (tp_var, tp), (options.x_ax, x_values), [options.y_ax])[options.y_ax]
+            valid = (y_values > 0) & (y_values <= y_limit)
+
+            if tp < tp_crit:
+
+                liquid = flash_batch(point, (tp_var, tp), ("Q", 0.), [options.x_ax, options.y_ax])
+                vapour = flash_batch(point, (tp_var, tp), ("Q", 1.), [options.x_ax])
+
+                inside = (x_values > liquid[options.x_ax]) & (x_values < vapour[options.x_ax])
+                y_values = np.where(inside, liquid[options.y_ax], y_values)
+                valid = valid | inside
+
+            if np.any(valid):
+
+                plotter.isolines_values[tp_var].update({
+
+                    '{:.0f} {}'.format(tp, point.get_unit(tp_var)): {
+
+                        "y": list(y_values[valid]), "x": list(x_values[valid])
+
+                    }
+
+                })
+
+    # Other isolines (e.g. iso-H)
+    for var_name in options.std_isolines_name:
+
+        spec = options.isoline_ranges[var_name]
+        for value in get_grid(spec[0], spec[1], spec[2]):
+
+            y_values = flash_batch(point, (var_name, value), (options.x_ax, x_values), [options.y_ax])[options.y_ax]
+            valid = y_values > 0
+
+            if np.any(valid):
+
+                plotter.isolines_values[var_name].update({
+
+                    '{:.0f} {}'.format(value, point.get_unit(var_name)): {
+
+                        "y": list(y_values[valid]), "x": list(x_values[valid])
+
+                    }
+
+                })
+
+
+def calculate_cached(plotter, cache_dir=None) -> bool:
+
+    """
+        Replaces "plotter.calculate()": the geometry is loaded from the disk cache if it has
+        already been calculated with the same key. Returns True if it has been loaded.
+    """
+
+    file_path = get_cache_path("diagram", get_diagram_key(plotter), cache_dir=cache_dir)
+
+    if os.path.isfile(file_path):
+        load_diagram(plotter, file_path)
+        return True
+
+    if supports_arrays(plotter.support_point):
+        calculate_batch(plotter)
+
+    else:
+        plotter.calculate()
+
+    save_diagram(plotter, file_path)
+    return False
+
+
+def precompute_task(args):
+
+    model_class, cache_dir = args
+
+    model = model_class()
+    model.initialize_role("thermo_plot")
+    plotter = model.init_diagram_plotter()
+
+    # The key must be evaluated before the calculation (which can change "plot_saturation")
+    file_path = get_cache_path("diagram", get_diagram_key(plotter), cache_dir=cache_dir)
+    calculate_cached(plotter, cache_dir=cache_dir)
+
+    return file_path
+
+
+def precompute_diagrams(model_classes: list, cache_dir=None, n_processes=1) -> list:
+
+    """
+        Fills the cache with the diagrams of the given AbstractDynamicModelThermo classes
+        (e.g. one student model for each fluid). Returns the list of the cache files.
+    """
+
+    tasks = [(model_class, cache_dir) for model_class in model_classes]
+
+    if n_processes == 1:
+        return [precompute_task(task) for task in tasks]
+
+    with Pool(processes=n_processes) as pool:
+        return pool.map(precompute_task, tasks)
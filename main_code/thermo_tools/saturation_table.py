@@ -0,0 +1,265 @@
+from main_code.thermo_tools.backend import ThermodynamicPoint, THERMO_BACKEND
+from main_code.thermo_tools.batch_flash import saturation_batch
+from main_code.thermo_tools.cache_utils import get_cache_path
+from scipy.interpolate import CubicSpline
+from scipy.optimize import brentq
+import numpy as np
+import os
+
+
+class SaturationTable:
+
+    """
+        Tabulated saturation properties of a fluid (P, T, rho_l, rho_v, h_l, h_v) built once
+        with REFPROP and then evaluated through cubic splines. The table can be queried both
+        by temperature and by pressure (splines in log(P)) and works on numpy arrays.
+    """
+
+    variables = ["P", "T", "rho_l", "rho_v", "h_l", "h_v"]
+
+    def __init__(self, fluids: list, composition: list, T_range=(1., 370.), n_points=300):
+
+        self.fluids = list(fluids)
+        self.composition = list(composition)
+        self.T_range = (float(T_range[0]), float(T_range[1]))
+        self.n_points = int(n_points)
+
+        self.values = None
+        self.max_error = None
+        self.__splines = dict()
+
+    @property
+    def key(self) -> tuple:
+        return THERMO_BACKEND, tuple(self.fluids), tuple(self.composition), self.T_range, self.n_points
+
+    @property
+    def is_ready(self) -> bool:
+        return self.values is not None
+
+    # <------------------------------------------------------------------------->
+    # BUILD, SAVE AND LOAD
+    # <------------------------------------------------------------------------->
+
+    def build(self):
+
+        tp = ThermodynamicPoint(self.fluids, self.composition)
+        T_values = np.linspace(self.T_range[0], self.T_range[1], self.n_points)
+
+        # A single batch call for each phase (each state is flashed once for all the outputs),
+        # a failed flash is raised instead of leaving NaN rows that the splines would reject
+        liquid, vapour = saturation_batch(tp, "T", T_values, outputs=("P", "rho", "h"), errors="raise")
+
+        values = {
+
+            "T": T_values, "P": liquid["P"],
+            "rho_l": liquid["rho"], "rho_v": vapour["rho"],
+            "h_l": liquid["h"], "h_v": vapour["h"]
+
+        }
+
+        # Array backends may return NaN without raising
+        failed = ~np.all(np.isfinite(np.array(list(values.values()))), axis=0)
+        if np.any(failed):
+            raise ValueError("Saturation properties not available for T = {} °C".format(T_values[failed]))
+
+        self.values = values
+
+        self.__init_splines()
+
+    @staticmethod
+    def __flash(tp, input_var, value):
+
+        tp.set_variable(input_var, value)
+        tp.set_variable("Q", 0.)
+        P = tp.get_variable("P")
+        rho_l = tp.get_variable("rho")
+        h_l = tp.get_variable("h")
+
+        tp.set_variable(input_var, value)
+        tp.set_variable("Q", 1.)
+        rho_v = tp.get_variable("rho")
+        h_v = tp.get_variable("h")
+
+        return P, rho_l, rho_v, h_l, h_v
+
+    def save(self, file_path):
+        np.savez_compressed(file_path, **self.values)
+
+    def load(self, file_path):
+
+        with np.load(file_path) as data:
+            self.values = {key: data[key] for key in self.variables}
+
+        self.__init_splines()
+
+    @classmethod
+    def load_or_build(cls, fluids: list, composition: list, T_range=(1., 370.), n_points=300, cache_dir=None):
+
+        table = cls(fluids, composition, T_range=T_range, n_points=n_points)
+        file_path = get_cache_path("saturation_table", table.key, cache_dir=cache_dir)
+
+        if os.path.isfile(file_path):
+            table.load(file_path)
+
+        else:
+            table.build()
+            table.save(file_path)
+
+        return table
+
+    def __init_splines(self):
+
+        # T is increasing along the table, P is increasing with T hence both can be used as abscissa
+        x_T = self.values["T"]
+        x_P = np.log(self.values["P"])
+
+        self.__splines = {"T": dict(), "P": dict()}
+        for key in self.variables:
+
+            if not key == "T":
+                self.__splines["T"].update({key: CubicSpline(x_T, self.values[key])})
+
+            if not key == "P":
+                self.__splines["P"].update({key: CubicSpline(x_P, self.values[key])})
+
+    # <------------------------------------------------------------------------->
+    # EVALUATION
+    # <------------------------------------------------------------------------->
+
+    def evaluate(self, variable: str, T=None, P=None):
+
+        """Saturation "variable" at the given T [°C] or P [MPa] (scalars or numpy arrays)."""
+
+        if T is not None:
+            x = np.clip(T, self.values["T"][0], self.values["T"][-1])
+            spline = self.__splines["T"][variable]
+
+        elif P is not None:
+            x = np.log(np.clip(P, self.values["P"][0], self.values["P"][-1]))
+            spline = self.__splines["P"][variable]
+
+        else:
+            raise ValueError("Either T or P must be provided")
+
+        result = spline(x)
+        if np.ndim(result) == 0:
+            return float(result)
+
+        return result
+
+    def saturation_conditions(self, T=None, P=None):
+
+        """Returns p_sat, rho_vap, rho_liq, h_liq, h_vap (same order of BoilerDynamicModel)."""
+
+        if T is not None:
+            p_sat = self.evaluate("P", T=T)
+
+        else:
+            p_sat = P
+
+        return (
+
+            p_sat,
+            self.evaluate("rho_v", T=T, P=P),
+            self.evaluate("rho_l", T=T, P=P),
+            self.evaluate("h_l", T=T, P=P),
+            self.evaluate("h_v", T=T, P=P)
+
+        )
+
+    def __quality_difference(self, T, h, rho):
+
+        # Difference between the vapour quality evaluated from the enthalpy and from the density
+        rho_v, rho_l = self.evaluate("rho_v", T=T), self.evaluate("rho_l", T=T)
+        h_l, h_v = self.evaluate("h_l", T=T), self.evaluate("h_v", T=T)
+        x_h = (h - h_l) / (h_v - h_l)
+        x_v = (1 / rho - 1 / rho_l) / (1 / rho_v - 1 / rho_l)
+        return x_h - x_v
+
+    def two_phase_state(self, h, rho):
+
+        """
+            Solves the two-phase state from the mean enthalpy and density using the table only.
+            Returns (T, P, x) or None if the point is not inside the saturation dome.
+        """
+
+        T_min, T_max = self.values["T"][0], self.values["T"][-1]
+        f_min = self.__quality_difference(T_min, h, rho)
+        f_max = self.__quality_difference(T_max, h, rho)
+
+        if not f_min * f_max < 0:
+            return None
+
+        T = brentq(lambda T_curr: self.__quality_difference(T_curr, h, rho), T_min, T_max, xtol=1e-9)
+        p_sat, rho_v, rho_l, h_l, h_v = self.saturation_conditions(T=T)
+        x = (h - h_l) / (h_v - h_l)
+
+        if not 0. <= x <= 1.:
+            return None
+
+        return T, p_sat, x
+
+    def two_phase_states(self, h, rho, n_iterations=40):
+
+        """
+            Vectorised version of "two_phase_state" (bisection on whole arrays).
+            Returns the arrays (T, P, x), NaN where the point is not inside the saturation dome.
+        """
+
+        h, rho = np.broadcast_arrays(np.asarray(h, dtype=float), np.asarray(rho, dtype=float))
+
+        T_low = np.full(h.shape, self.values["T"][0])
+        T_high = np.full(h.shape, self.values["T"][-1])
+        f_low = self.__quality_difference(T_low, h, rho)
+        f_high = self.__quality_difference(T_high, h, rho)
+        valid = f_low * f_high < 0
+
+        for i in range(n_iterations):
+
+            T_mid = (T_low + T_high) / 2
+            f_mid = self.__quality_difference(T_mid, h, rho)
+            move_low = np.sign(f_mid) == np.sign(f_low)
+
+            T_low = np.where(move_low, T_mid, T_low)
+            f_low = np.where(move_low, f_mid, f_low)
+            T_high = np.where(move_low, T_high, T_mid)
+
+        T = (T_low + T_high) / 2
+        p_sat, rho_v, rho_l, h_l, h_v = self.saturation_conditions(T=T)
+        x = (h - h_l) / (h_v - h_l)
+
+        valid &= (x >= 0.) & (x <= 1.)
+        T = np.where(valid, T, np.nan)
+        p_sat = np.where(valid, p_sat, np.nan)
+        x = np.where(valid, x, np.nan)
+
+        return T, p_sat, x
+
+    # <------------------------------------------------------------------------->
+    # ACCURACY
+    # <------------------------------------------------------------------------->
+
+    def evaluate_error(self, n_points=None) -> dict:
+
+        """
+            Maximum relative error of the interpolated values against the exact REFPROP call.
+            The check points are placed halfway between the table nodes (worst case for the splines).
+        """
+
+        if n_points is None:
+            n_points = self.n_points - 1
+
+        tp = ThermodynamicPoint(self.fluids, self.composition)
+        T_nodes = np.linspace(self.T_range[0], self.T_range[1], n_points + 1)
+        T_check = (T_nodes[1:] + T_nodes[:-1]) / 2
+
+        self.max_error = {key: 0. for key in self.variables if not key == "T"}
+        for T in T_check:
+
+            exact = dict(zip(["P", "rho_l", "rho_v", "h_l", "h_v"], self.__flash(tp, "T", T)))
+
+            for key in self.max_error.keys():
+                error = abs(self.evaluate(key, T=T) - exact[key]) / max(abs(exact[key]), 1e-12)
+                self.max_error[key] = max(self.max_error[key], float(error))
+
+        return self.max_error
@@ -0,0 +1,382 @@
+from scipy.optimize import brentq
+import numpy as np
+
+
+# <----------------------------------------------------------------------------->
+# FLUIDS
+# <----------------------------------------------------------------------------->
+
+class StubFluid:
+
+    """
+        Very simple two-phase fluid (units "SI WITH C": °C, MPa, kJ/kg, kg/m^3), all the
+        functions accept NumPy arrays:
+
+            saturation pressure     Antoine equation        ln(P [Pa]) = A - B / (T [K] + C)
+            liquid                  incompressible          rho = rho_l0 - drho_l * T,  h = cp_l * T
+            vapour                  ideal gas               rho = P / (R T),            h = r_0 + cp_v * T
+
+        Good enough to exercise the models (and benchmark them) where REFPROP is not available,
+        NOT to get physically accurate results.
+    """
+
+    def __init__(self, name, antoine, rho_l0, drho_l, cp_l, cp_v, r_0, R, TC, PC, T_min):
+
+        self.name = name
+        self.antoine = antoine      # (A, B, C)
+        self.rho_l0 = rho_l0        # [kg/m^3]
+        self.drho_l = drho_l        # [kg/m^3/K]
+        self.cp_l = cp_l            # [kJ/kg/K]
+        self.cp_v = cp_v            # [kJ/kg/K]
+        self.r_0 = r_0              # [kJ/kg] latent heat at 0°C
+        self.R = R                  # [J/kg/K]
+        self.TC = TC                # [°C]
+        self.PC = PC                # [MPa]
+        self.T_min = T_min          # [°C]
+
+    def p_sat(self, T):
+        A, B, C = self.antoine
+        return np.exp(A - B / (T + 273.15 + C)) / 1e6
+
+    def t_sat(self, P):
+        A, B, C = self.antoine
+        return B / (A - np.log(P * 1e6)) - C - 273.15
+
+    def rho_liq(self, T):
+        return self.rho_l0 - self.drho_l * T
+
+    def rho_vap(self, T, P):
+        return P * 1e6 / (self.R * (T + 273.15))
+
+    def h_liq(self, T):
+        return self.cp_l * T
+
+    def h_vap(self, T):
+        return self.r_0 + self.cp_v * T
+
+
+STUB_FLUIDS = {
+
+    "water": StubFluid(
+
+        "water", antoine=(23.1964, 3816.44, -46.13), rho_l0=1000., drho_l=0.5,
+        cp_l=4.18, cp_v=1.82, r_0=2501., R=461.5, TC=373.946, PC=22.064, T_min=0.01
+
+    ),
+
+    "n-pentane": StubFluid(
+
+        "n-pentane", antoine=(20.726, 2477.06, -39.945), rho_l0=645., drho_l=0.95,
+        cp_l=2.32, cp_v=1.66, r_0=380., R=115.2, TC=196.55, PC=3.3675, T_min=-129.
+
+    )
+
+}
+
+
+def get_stub_fluid(fluids: list) -> StubFluid:
+
+    name = str(fluids[0]).lower()
+    if not len(fluids) == 1 or name not in STUB_FLUIDS:
+        raise ValueError("The stub backend only supports the pure fluids {}".format(list(STUB_FLUIDS.keys())))
+
+    return STUB_FLUIDS[name]
+
+
+# <----------------------------------------------------------------------------->
+# FLASH CALCULATIONS (vectorised: inputs can be floats or NumPy arrays)
+# <----------------------------------------------------------------------------->
+
+def saturated_state(fluid: StubFluid, T, Q) -> dict:
+
+    P = fluid.p_sat(T)
+    rho_l, rho_v = fluid.rho_liq(T), fluid.rho_vap(T, P)
+    h_l, h_v = fluid.h_liq(T), fluid.h_vap(T)
+
+    return {
+
+        "T": T, "P": P, "Q": Q,
+        "rho": 1 / ((1 - Q) / rho_l + Q / rho_v),
+        "H": h_l + Q * (h_v - h_l)
+
+    }
+
+
+def single_phase_state(fluid: StubFluid, T, P, liquid) -> dict:
+
+    rho = np.where(liquid, fluid.rho_liq(T), fluid.rho_vap(T, P))
+    h = np.where(liquid, fluid.h_liq(T), fluid.h_vap(T))
+
+    # Extrapolated quality (< 0 subcooled liquid, > 1 superheated vapour), as REFPROP
+    T_sat = fluid.t_sat(P)
+    h_l, h_v = fluid.h_liq(T_sat), fluid.h_vap(T_sat)
+    return {"T": T, "P": P, "Q": (h - h_l) / (h_v - h_l), "rho": rho, "H": h}
+
+
+def select_state(condition, state_true: dict, state_false: dict) -> dict:
+    return {key: np.where(condition, state_true[key], state_false[key]) for key in state_true.keys()}
+
+
+def density_quality(fluid: StubFluid, T, rho):
+
+    P = fluid.p_sat(T)
+    rho_l, rho_v = fluid.rho_liq(T), fluid.rho_vap(T, P)
+    return (1 / rho - 1 / rho_l) / (1 / rho_v - 1 / rho_l)
+
+
+def enthalpy_quality(fluid: StubFluid, T, h):
+    return (h - fluid.h_liq(T)) / (fluid.h_vap(T) - fluid.h_liq(T))
+
+
+def h_rho_saturation_temperature(fluid: StubFluid, h, rho, n_iterations=60):
+
+    """
+        Temperature at which the quality evaluated from h and the one evaluated from rho are
+        equal (NaN if there is none): brentq for single values, bisection for arrays.
+    """
+
+    def difference(T):
+        return enthalpy_quality(fluid, T, h) - density_quality(fluid, T, rho)
+
+    T_low, T_high = fluid.T_min, fluid.TC - 1e-6
+
+    if np.ndim(h) == 0 and np.ndim(rho) == 0:
+
+        if difference(T_low) * difference(T_high) > 0:
+            return np.nan
+
+        return brentq(difference, T_low, T_high)
+
+    h, rho = np.broadcast_arrays(np.asarray(h, dtype=float), np.asarray(rho, dtype=float))
+    low = np.full(h.shape, T_low)
+    high = np.full(h.shape, T_high)
+
+    difference_low = difference(low)
+    valid = difference_low * difference(high) <= 0
+
+    for i in range(n_iterations):
+
+        middle = (low + high) / 2
+        difference_middle = difference(middle)
+        same_sign = difference_middle * difference_low > 0
+
+        low = np.where(same_sign, middle, low)
+        difference_low = np.where(same_sign, difference_middle, difference_low)
+        high = np.where(same_sign, high, middle)
+
+    return np.where(valid, (low + high) / 2, np.nan)
+
+
+def flash_h_rho(fluid: StubFluid, h, rho) -> dict:
+
+    T_sat = h_rho_saturation_temperature(fluid, h, rho)
+    Q = enthalpy_quality(fluid, T_sat, h)
+    two_phase = np.isfinite(T_sat) & (Q >= 0.) & (Q <= 1.)
+
+    # Incompressible liquid: the pressure is not defined, the saturation one is used
+    T_liq = h / fluid.cp_l
+    liquid = rho >= fluid.rho_liq(T_liq)
+    liquid_state = single_phase_state(fluid, T_liq, fluid.p_sat(T_liq), liquid=True)
+
+    T_vap = (h - fluid.r_0) / fluid.cp_v
+    vapour_state = single_phase_state(fluid, T_vap, rho * fluid.R * (T_vap + 273.15) / 1e6, liquid=False)
+
+    state = select_state(
+
+        two_phase, saturated_state(fluid, np.where(two_phase, T_sat, fluid.T_min), Q),
+        select_state(liquid, liquid_state, vapour_state)
+
+    )
+    state.update({"rho": rho * np.ones_like(state["rho"]), "H": h * np.ones_like(state["H"])})
+    return state
+
+
+def flash_p_h(fluid: StubFluid, P, h) -> dict:
+
+    T_sat = fluid.t_sat(P)
+    h_l, h_v = fluid.h_liq(T_sat), fluid.h_vap(T_sat)
+
+    return select_state(
+
+        h < h_l, single_phase_state(fluid, h / fluid.cp_l, P, liquid=True),
+        select_state(
+
+            h > h_v, single_phase_state(fluid, (h - fluid.r_0) / fluid.cp_v, P, liquid=False),
+            saturated_state(fluid, T_sat, (h - h_l) / (h_v - h_l))
+
+        )
+
+    )
+
+
+def flash_t_rho(fluid: StubFluid, T, rho) -> dict:
+
+    P_sat = fluid.p_sat(T)
+    rho_l, rho_v = fluid.rho_liq(T), fluid.rho_vap(T, P_sat)
+
+    two_phase_state = saturated_state(fluid, T, density_quality(fluid, T, rho))
+    liquid_state = single_phase_state(fluid, T, P_sat, liquid=True)
+    vapour_state = single_phase_state(fluid, T, rho * fluid.R * (T + 273.15) / 1e6, liquid=False)
+
+    vapour = (rho <= rho_v) | (T >= fluid.TC)
+    state = select_state(vapour, vapour_state, select_state(rho >= rho_l, liquid_state, two_phase_state))
+    state.update({"rho": rho * np.ones_like(state["rho"])})
+    return state
+
+
+def flash_p_rho(fluid: StubFluid, P, rho) -> dict:
+
+    T_sat = fluid.t_sat(P)
+    rho_l, rho_v = fluid.rho_liq(T_sat), fluid.rho_vap(T_sat, P)
+
+    T_liq = (fluid.rho_l0 - rho) / fluid.drho_l
+    T_vap = P * 1e6 / (rho * fluid.R) - 273.15
+
+    two_phase_state = saturated_state(fluid, T_sat, density_quality(fluid, T_sat, rho))
+    liquid_state = single_phase_state(fluid, T_liq, P, liquid=True)
+    vapour_state = single_phase_state(fluid, T_vap, P, liquid=False)
+
+    vapour = (rho <= rho_v) | (P >= fluid.PC)
+    state = select_state(vapour, vapour_state, select_state(rho >= rho_l, liquid_state, two_phase_state))
+    state.update({"rho": rho * np.ones_like(state["rho"])})
+    return state
+
+
+def flash(fluid: StubFluid, inputs: dict) -> dict:
+
+    """State {"T", "P", "Q", "rho", "H"} from two inputs (floats or arrays that can be broadcast)."""
+
+    pair = set(inputs.keys())
+
+    with np.errstate(all="ignore"):
+
+        if pair == {"T", "Q"}:
+            return saturated_state(fluid, inputs["T"], inputs["Q"])
+
+        if pair == {"P", "Q"}:
+            return saturated_state(fluid, fluid.t_sat(inputs["P"]), inputs["Q"])
+
+        if pair == {"T", "P"}:
+            liquid = inputs["P"] >= fluid.p_sat(inputs["T"])
+            return single_phase_state(fluid, inputs["T"], inputs["P"], liquid)
+
+        if pair == {"P", "H"}:
+            return flash_p_h(fluid, inputs["P"], inputs["H"])
+
+        if pair == {"H", "rho"}:
+            return flash_h_rho(fluid, inputs["H"], inputs["rho"])
+
+        if pair == {"T", "rho"}:
+            return flash_t_rho(fluid, inputs["T"], inputs["rho"])
+
+        if pair == {"P", "rho"}:
+            return flash_p_rho(fluid, inputs["P"], inputs["rho"])
+
+    raise ValueError("Input pair {} is not supported by the stub backend".format(list(inputs.keys())))
+
+
+# <----------------------------------------------------------------------------->
+# THERMODYNAMIC POINT
+# <----------------------------------------------------------------------------->
+
+class StubRPHandler:
+
+    def __init__(self, fluids, composition, unit_system="SI WITH C"):
+
+        self.fluids = list(fluids)
+        self.composition = list(composition)
+        self.unit_system = unit_system
+        self.fluid = get_stub_fluid(self.fluids)
+
+    @property
+    def TC(self):
+        return self.fluid.TC
+
+    @property
+    def PC(self):
+        return self.fluid.PC
+
+
+class StubThermodynamicPoint:
+
+    """
+        Same interface of REFPROPConnector.ThermodynamicPoint (set_variable, get_variable,
+        get_unit, duplicate, RPHandler) built on a StubFluid. As in REFPROP the state is
+        defined by the last two different variables set. Supported pairs: T-Q, P-Q, T-P, P-H,
+        H-rho, T-rho and P-rho.
+
+        Values can also be NumPy arrays: "get_variable" then returns the array of the results
+        (e.g. set_variable("T", np.linspace(20, 200, 1000)), set_variable("Q", 0.)).
+    """
+
+    VARIABLES = {"t": "T", "p": "P", "q": "Q", "h": "H", "rho": "rho", "d": "rho"}
+    UNITS = {"T": "°C", "P": "MPa", "Q": "-", "H": "kJ/kg", "rho": "kg/m^3"}
+    supports_arrays = True
+
+    def __init__(self, fluids, composition, unit_system="SI WITH C"):
+
+        self.RPHandler = StubRPHandler(fluids, composition, unit_system)
+        self.fluid = self.RPHandler.fluid
+
+        self.inputs = dict()
+        self.state = None
+
+    def __get_name(self, variable) -> str:
+
+        name = self.VARIABLES.get(str(variable).lower())
+        if name is None:
+            raise ValueError("Variable '{}' is not supported by the stub backend".format(variable))
+
+        return name
+
+    @staticmethod
+    def __check_unit_system(other_unit_system):
+
+        # Same signature as ThermodynamicPoint, but the stub works only in its own unit system
+        if other_unit_system is not None:
+            raise NotImplementedError("The stub backend does not support other unit systems")
+
+    def set_variable(self, variable, value, other_unit_system=None):
+
+        self.__check_unit_system(other_unit_system)
+        name = self.__get_name(variable)
+        self.inputs.pop(name, None)
+
+        if np.ndim(value) == 0:
+            self.inputs[name] = float(value)
+
+        else:
+            self.inputs[name] = np.asarray(value, dtype=float)
+
+        self.state = None
+
+    def get_variable(self, variable, other_unit_system=None):
+
+        self.__check_unit_system(other_unit_system)
+        if self.state is None:
+            self.state = self.__flash()
+
+        return self.state[self.__get_name(variable)]
+
+    def get_unit(self, variable) -> str:
+        return self.UNITS[self.__get_name(variable)]
+
+    def duplicate(self):
+
+        point = StubThermodynamicPoint(self.RPHandler.fluids, self.RPHandler.composition, self.RPHandler.unit_system)
+        point.inputs = dict(self.inputs)
+        return point
+
+    def __flash(self) -> dict:
+
+        names = list(self.inputs.keys())[-2:]
+        if not len(names) == 2:
+            raise ValueError("Two variables must be set before evaluating the state")
+
+        inputs = {name: self.inputs[name] for name in names}
+        state = flash(self.fluid, inputs)
+
+        if all(np.ndim(value) == 0 for value in inputs.values()):
+            return {key: float(value) for key, value in state.items()}
+
+        return state
@@ -1,10 +1,16 @@
 from main_code.dynamic_classes.student_abstract_class import AbstractStudentClass, keyboard
-from REFPROPConnector import ThermodynamicPoint
+from main_code.thermo_tools.backend import ThermodynamicPoint
 import numpy as np
 
 
 class Evaporator(AbstractStudentClass):
 
+    # Sections timed with "with self.profile(...)" (shown on the dashboard when profiling)
+    profile_sections = ["flash_h_rho", "saturation"]
+
+    # Fluid of "self.tp" (the thermodynamic diagram process only needs this)
+    fluid = "n-pentane"
+
     @staticmethod
     def get_shared_params() -> dict:
 
@@ -17,12 +23,15 @@ class Evaporator(AbstractStudentClass):
     def init_internal_parameters(self):
 
         # INSERT HERE THE CODE DEFINED BEFORE THE WHILE LOOP
-        liquido = "n-pentane"
+        liquido = self.fluid
 
         self.tp = ThermodynamicPoint([liquido], [1.])
         self.tp_liq = ThermodynamicPoint([liquido], [1.])
         self.tp_vap = ThermodynamicPoint([liquido], [1.])
 
+        # (set "use_saturation_table = True" to replace the saturation flashes with a table)
+        self.init_saturation_table(T_range=(-50., 190.))
+
         # DATI INIZIALI
         self.T_in = 20
         self.V_in = 1
@@ -71,27 +80,37 @@ class Evaporator(AbstractStudentClass):
         self.h_tot += dh
 
         # nuove condizioni
-        self.tp.set_variable("H", self.h_tot)
-        self.tp.set_variable("rho", self.m_tot / self.V_in)
-        self.p_sat = self.tp.get_variable("P")
+        with self.profile("flash_h_rho"):
+            self.tp.set_variable("H", self.h_tot)
+            self.tp.set_variable("rho", self.m_tot / self.V_in)
+            self.p_sat = self.get_step_variable(self.tp, "P")
 
-        # memorizzo variabili di interesse
-        self.x = self.tp.get_variable("Q")
+            # memorizzo variabili di interesse
+            self.x = self.get_step_variable(self.tp, "Q")
 
         if 0 < self.x < 1:
 
-            # aggiorno le entalpie a condiz. di vapor saturo e liquido saturo
-            self.tp_liq.set_variable("Q", 0)
-            self.tp_liq.set_variable("P", self.tp.get_variable("P"))
+            with self.profile("saturation"):
+
+                if self.saturation_table is not None:
+
+                    p_sat, rho_v, rho_l, self.h_l, self.h_v = self.saturation_table.saturation_conditions(P=self.p_sat)
+                    self.V_x = 1 - self.x * self.m_tot / rho_v * self.V_in
+
+                else:
+
+                    # aggiorno le entalpie a condiz. di vapor saturo e liquido saturo
+                    self.tp_liq.set_variable("Q", 0)
+                    self.tp_liq.set_variable("P", self.p_sat)
 
-            self.tp_vap.set_variable("Q", 1)
-            self.tp_vap.set_variable("P", self.tp.get_variable("P"))
-            rho_v = self.tp_vap.get_variable("rho")
+                    self.tp_vap.set_variable("Q", 1)
+                    self.tp_vap.set_variable("P", self.p_sat)
+                    rho_v = self.tp_vap.get_variable("rho")
 
-            self.V_x = 1 - self.x * self.m_tot / rho_v * self.V_in
+                    self.V_x = 1 - self.x * self.m_tot / rho_v * self.V_in
 
-            self.h_l = self.tp_liq.get_variable("h")
-            self.h_v = self.tp_vap.get_variable("h")
+                    self.h_l = self.tp_liq.get_variable("h")
+                    self.h_v = self.tp_vap.get_variable("h")
 
         else:
 
@@ -0,0 +1,29 @@
+# %% IMPORT MODULES
+from main_code.decimation import Decimator
+import numpy as np
+
+
+# %% MINMAX ENVELOPE
+# The extremes must be written in the order in which they happened: a falling ramp gives
+# falling rows (and a rising one rising rows), at the first and last time of each block
+t = np.arange(8.)
+for signal, expected in [
+
+    (10 - t, [[0, 10], [3, 7], [4, 6], [7, 3]]),
+    (t, [[0, 0], [3, 3], [4, 4], [7, 7]])
+
+]:
+
+    decimator = Decimator(4, mode="minmax")
+    blocks = [decimator.push(row) for row in np.column_stack((t, signal))]
+    rows = np.concatenate([block for block in blocks if block is not None])
+
+    print(rows.tolist())
+    assert np.array_equal(rows, expected)
+
+
+# %% PEAK INSIDE A BLOCK
+decimator = Decimator(4, mode="minmax")
+blocks = [decimator.push(row) for row in [[0, 1.], [1, 5.], [2, -2.], [3, 0.]]]
+print(blocks[-1].tolist())
+assert np.array_equal(blocks[-1], [[0, 5], [3, -2]])
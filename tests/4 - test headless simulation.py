@@ -0,0 +1,46 @@
+# %% IMPORT MODULES
+from main_code import BoilerDynamicModel, WaterTankDynamicModel, run_headless
+from matplotlib import pyplot as plt
+import time
+
+
+# %% WATER TANK
+tank = WaterTankDynamicModel()
+
+start_time = time.time()
+tank_results = run_headless(
+
+    tank, dt=0.1, horizon=200,
+    schedule={"m_in_perc": lambda t: 50. if t < 100 else 80.}
+
+)
+print("Water Tank: {} steps in {:.3f}s".format(len(tank_results), time.time() - start_time))
+
+
+# %% BOILER
+boiler = BoilerDynamicModel()
+
+start_time = time.time()
+boiler_results = run_headless(
+
+    boiler, dt=0.05, horizon=200,
+    initial_values={"m_in_perc": 0., "yd_perc": 1.},
+    stop_on_error=True
+
+)
+print("Boiler: {} steps in {:.3f}s".format(len(boiler_results), time.time() - start_time))
+
+
+# %% PLOT
+fig, axs = plt.subplots(nrows=1, ncols=2)
+
+axs[0].plot(tank_results[:, 0], tank_results[:, 1])
+axs[0].set_xlabel(tank.x_label)
+axs[0].set_ylabel(tank.y_labels[0])
+
+axs[1].plot(boiler_results[:, 0], boiler_results[:, 2])
+axs[1].set_xlabel(boiler.x_label)
+axs[1].set_ylabel(boiler.y_labels[1])
+
+plt.tight_layout()
+plt.show()
@@ -0,0 +1,27 @@
+# %% IMPORT MODULES
+from main_code import BoilerDynamicModel, run_sweep
+from matplotlib import pyplot as plt
+
+
+if __name__ == '__main__':
+
+    # %% SWEEP
+    yds_perc = [0.1, 1, 10, 100]
+    sweep = run_sweep(
+
+        BoilerDynamicModel, dt=0.05, horizon=200,
+        class_params={"q_in": [1, 5]},
+        shared_params={"m_in_perc": [0.], "yd_perc": yds_perc}
+
+    )
+    results = sweep.reshaped()  # (q_in, m_in_perc, yd_perc, step, variable)
+
+    # %% PLOT
+    fig, axs = plt.subplots(nrows=1, ncols=2)
+
+    for i, yd_perc in enumerate(yds_perc):
+        axs[0].plot(results[0, 0, i, :, 0], results[0, 0, i, :, 2], label=yd_perc)
+        axs[1].plot(results[0, 0, i, :, 0], results[0, 0, i, :, 3], label=yd_perc)
+
+    plt.legend(loc='best')
+    plt.show()
@@ -0,0 +1,46 @@
+# %% OPTIONS
+import os
+
+USE_STUB_BACKEND = True     # True to run without REFPROP (timings are not comparable with REFPROP ones)
+QUICK = False               # Fewer steps, just to check that everything runs
+REFERENCE_FILE = None       # JSON of a previous run to look for regressions
+
+# The backend is selected when main_code is imported
+if USE_STUB_BACKEND:
+    os.environ["LSE_THERMO_BACKEND"] = "stub"
+
+
+# %% IMPORT MODULES
+from main_code.thermo_tools.backend import ThermodynamicPoint as PointClass
+from main_code.benchmark import run_benchmarks, compare_benchmarks
+from main_code import BoilerDynamicModel, WaterTankDynamicModel
+from students_projects.example_class import Evaporator
+import json
+
+
+# %% RUN
+model_classes = {
+
+    "water_tank": WaterTankDynamicModel,
+    "boiler": BoilerDynamicModel,
+    "evaporator": Evaporator
+
+}
+
+results = run_benchmarks(model_classes, point_class=PointClass, quick=QUICK)
+
+output_file = "benchmark_{}.json".format(results["environment"]["commit"] or "results")
+with open(output_file, "w") as file:
+    json.dump(results, file, indent=4)
+
+print("Results saved in '{}'".format(os.path.abspath(output_file)))
+
+
+# %% COMPARE
+if REFERENCE_FILE is not None:
+
+    with open(REFERENCE_FILE, "r") as file:
+        reference = json.load(file)
+
+    for key, reference_value, new_value in compare_benchmarks(reference, results):
+        print("{}: {:.3g} -> {:.3g} ({:+.0f}%)".format(key, reference_value, new_value, (new_value / reference_value - 1) * 100))
@@ -0,0 +1,19 @@
+# %% IMPORT MODULES
+from main_code import SimulationService, CalculatorOptions, WaterTankDynamicModel, BoilerDynamicModel
+from students_projects.example_class import Evaporator
+
+
+# %% RUN
+if __name__ == '__main__':
+
+    options = CalculatorOptions()
+    options.time_factor = 10.
+    options.buffer_size = 500
+
+    # Processes are started once: from the second run on they are ready in a few milliseconds
+    with SimulationService() as service:
+
+        for model in [WaterTankDynamicModel(), BoilerDynamicModel(), Evaporator()]:
+
+            errors = service.run(model, options, duration=5.)
+            print("{} finished ({} errors)".format(type(model).__name__, len(errors)))
@@ -0,0 +1,44 @@
+# %% IMPORT MODULES
+from main_code import BoilerDynamicModel, run_headless, replay_headless, StepSchedule, RampSchedule
+from matplotlib import pyplot as plt
+import time
+import os
+
+
+INPUT_RECORD_FILE = "inputs.csv"    # Saved by a live run of the Evaporator with "options.input_record_file"
+
+
+# %% SCHEDULED INPUTS
+boiler = BoilerDynamicModel()
+results = run_headless(
+
+    boiler, dt=0.05, horizon=300,
+    schedule={
+
+        "m_in_perc": RampSchedule(0., 20., t_start=50., t_end=150.),
+        "yd_perc": StepSchedule(1., 20., t_step=200.)
+
+    },
+    stop_on_error=True
+
+)
+
+fig, axs = plt.subplots(nrows=len(boiler.y_labels))
+for n, ax in enumerate(axs):
+    ax.plot(results[:, 0], results[:, n + 1])
+    ax.set_ylabel(boiler.y_labels[n])
+
+plt.tight_layout()
+plt.show()
+
+
+# %% REPLAY OF A LIVE RUN
+if os.path.isfile(INPUT_RECORD_FILE):
+
+    from students_projects.example_class import Evaporator
+
+    start_time = time.time()
+    replay_results = replay_headless(Evaporator(), INPUT_RECORD_FILE)
+    elapsed_time = time.time() - start_time
+
+    print("{:.1f}s of simulation replayed in {:.3f}s".format(replay_results[-1, 0], elapsed_time))
@@ -0,0 +1,31 @@
+# %% IMPORT MODULES
+from main_code import BoilerDynamicModel, build_operating_map
+from matplotlib import pyplot as plt
+import numpy as np
+
+
+if __name__ == '__main__':
+
+    # %% STEADY STATE
+    boiler = BoilerDynamicModel()
+    print(boiler.get_steady_state(m_in_perc=0.3, yd_perc=20.))
+
+    # %% OPERATING MAP (stored in the cache folder, loaded by the next runs)
+    m_in_values = np.linspace(0.25, 2., 15)
+    yds_perc = [1, 5, 20, 50, 100]
+    operating_map = build_operating_map(BoilerDynamicModel, m_in_values, yds_perc)
+
+    # %% PLOT
+    fig, axs = plt.subplots(nrows=1, ncols=2)
+
+    for j, yd_perc in enumerate(yds_perc):
+        axs[0].plot(m_in_values, operating_map.values["T"][:, j], label=yd_perc)
+        axs[1].plot(m_in_values, operating_map.values["P"][:, j], label=yd_perc)
+
+    axs[0].set_xlabel("m_in (%)")
+    axs[0].set_ylabel("T (°C)")
+    axs[1].set_xlabel("m_in (%)")
+    axs[1].set_ylabel("P (MPa)")
+
+    plt.legend(loc='best')
+    plt.show()